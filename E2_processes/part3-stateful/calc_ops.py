@@ -0,0 +1,89 @@
+"""
+================================================================================
+Part 3: Calculator Hot Path (compilable with mypyc)
+================================================================================
+
+The few lines every calculate/use_last request runs - the arithmetic and
+the session bookkeeping - live here, fully type-annotated, so they can be
+compiled to a C extension:
+
+    pip install mypy
+    mypyc calc_ops.py
+
+mypyc writes calc_ops.<platform>.so next to this file. Python prefers the
+extension over calc_ops.py on import, so stateful_server.py picks up the
+compiled version with no code change. Delete the .so to go back to the
+interpreted one.
+
+    ┌─────────────────────────────┐         ┌─────────────────────────────┐
+    │  calc_ops.py (interpreted)  │  mypyc  │  calc_ops.*.so (native)     │
+    │                             │ ──────► │                             │
+    │  every op is dispatched     │         │  typed list/int ops become  │
+    │  by the bytecode loop       │         │  direct C calls             │
+    └─────────────────────────────┘         └─────────────────────────────┘
+
+================================================================================
+"""
+
+import operator
+from array import array
+from typing import Any, Callable, Dict, Final, List, Optional, Tuple
+
+Number = Any  # int or float, whatever the client sent
+
+# One history entry: (a, op, b, result). A tuple is smaller than a dict, and
+# building it needs no string formatting.
+Entry = Tuple[Number, str, Number, Optional[Number]]
+
+# Arithmetic operators: one dict lookup to a C built-in instead of an
+# if/elif ladder of string compares
+ARITH_OPS: Final[Dict[str, Callable[[Number, Number], Number]]] = {
+    'add': operator.add,
+    'multiply': operator.mul,
+    'subtract': operator.sub,
+}
+
+
+def apply_op(op: str, a: Number, b: Number) -> Optional[Number]:
+    """Return a OP b, or None for an unknown operator."""
+    fn = ARITH_OPS.get(op)
+    if fn is None:
+        return None
+    return fn(a, b)
+
+
+NAN: Final = float('nan')
+
+
+def as_float(value: Any) -> float:
+    """value as a C double for a results array; NaN if it isn't a number."""
+    if type(value) is int or type(value) is float:
+        try:
+            return float(value)
+        except OverflowError:  # int too large for a double
+            return NAN
+    return NAN
+
+
+def record(history: List[Any], results: List[Any], last_result: List[Any],
+           operation_count: List[int], slot: int,
+           a: Number, op: str, b: Number, result: Optional[Number]) -> None:
+    """
+    Append one operation to a session's columns and make it the last_result.
+
+    The caller must hold the session's lock.
+    """
+    entries = history[slot]
+    entries.append((a, op, b, result))
+    column: array = results[slot]
+    column.append(as_float(result))
+    if len(column) > len(entries):
+        del column[0]  # history is a full ring and dropped its oldest entry
+    last_result[slot] = result  # Store for "use_last"
+    operation_count[slot] += 1
+
+
+def entry_to_dict(entry: Entry) -> Dict[str, Any]:
+    """Format a history entry for a response: {"operation": "10 add 5", ...}"""
+    a, op, b, result = entry
+    return {'operation': f"{a} {op} {b}", 'result': result}
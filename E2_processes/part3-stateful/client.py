@@ -79,11 +79,58 @@ ARCHITECTURE OVERVIEW
 ================================================================================
 """
 
+import io
 import socket
 import json
+import sys
 import threading
 import time
 
+# Plain json on purpose: the servers may run orjson, but this demo is not
+# on a hot path, and json keeps any-size ints exact both ways (orjson reads
+# an exact 10**20 reply as 1e+20 and cannot encode it at all).
+json_loads = json.loads
+
+
+def json_dumps(obj):
+    return json.dumps(obj).encode()
+
+
+def _exchange(port, request):
+    """
+    Send one encoded JSON request (bytes) to localhost:<port> and return
+    the decoded reply.
+    
+    After sending we shut down our write side, so the server sees a clean
+    EOF, then read until the server closes. An immediate close() while the
+    reply is still in flight can trigger a RST; reading to EOF also means
+    replies larger than a single recv() are never truncated.
+    
+        Client                          Server
+           │  sendall(request)               │
+           │────────────────────────────────►│
+           │  shutdown(SHUT_WR)  ── FIN ────►│
+           │◄────────────────────────────────│  reply
+           │◄──────────── FIN ───────────────│  close
+           │  recv() == b''  → done          │
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.connect(('localhost', port))
+        sock.sendall(request)
+        sock.shutdown(socket.SHUT_WR)
+        
+        data = bytearray()
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+    finally:
+        sock.close()
+    
+    return json_loads(data)
+
 
 def send_to_stateless(operation, a, b):
     """
@@ -120,16 +167,8 @@ def send_to_stateless(operation, a, b):
     ────────
     dict : Response containing "result" and "server_type"
     """
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.connect(('localhost', 8001))
-    
-    request = json.dumps({'operation': operation, 'a': a, 'b': b})
-    sock.send(request.encode())
-    
-    response = json.loads(sock.recv(1024).decode())
-    sock.close()
-    
-    return response
+    request = json_dumps({'operation': operation, 'a': a, 'b': b})
+    return _exchange(8001, request)
 
 
 def send_to_stateful(operation, session_id=None, **kwargs):
@@ -178,20 +217,12 @@ def send_to_stateful(operation, session_id=None, **kwargs):
     ────────
     dict : Response (varies by operation, always includes session_id)
     """
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.connect(('localhost', 8002))
-    
-    request = json.dumps({
+    request = json_dumps({
         'operation': operation,
         'session_id': session_id,
         **kwargs
     })
-    sock.send(request.encode())
-    
-    response = json.loads(sock.recv(1024).decode())
-    sock.close()
-    
-    return response
+    return _exchange(8002, request)
 
 
 def compare_servers():
@@ -210,19 +241,36 @@ def compare_servers():
     │   • What additional features stateful provides                         │
     │                                                                         │
     └─────────────────────────────────────────────────────────────────────────┘
+    
+    Output is collected in memory and written to stdout in one go at the
+    end, instead of one write() per print() call.
     """
-    print("="*70)
-    print("COMPARISON: Stateless vs Stateful Server")
-    print("Task: Calculate ((10 + 5) × 2) - 3 = 27")
-    print("="*70)
+    buf = io.StringIO()
+    
+    def out(*args):
+        print(*args, file=buf)
+    
+    try:
+        _run_comparison(out)
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+
+def _run_comparison(out):
+    """Run the comparison steps, sending every line of output to out()."""
+    out("="*70)
+    out("COMPARISON: Stateless vs Stateful Server")
+    out("Task: Calculate ((10 + 5) × 2) - 3 = 27")
+    out("="*70)
     
     # =========================================================================
     # STATELESS SERVER TEST
     # =========================================================================
-    print("\n" + "-"*35)
-    print("STATELESS SERVER")
-    print("-"*35)
-    print("""
+    out("\n" + "-"*35)
+    out("STATELESS SERVER")
+    out("-"*35)
+    out("""
     ┌────────────────────────────────────────────────────────────┐
     │  With STATELESS server:                                    │
     │  • Client tracks intermediate results                      │
@@ -244,8 +292,8 @@ def compare_servers():
     #   stores 15
     #
     result1 = send_to_stateless('add', 10, 5)['result']
-    print(f"  Request 1: send(add, 10, 5) → {result1}")
-    print(f"  Client stores: result = {result1}")
+    out(f"  Request 1: send(add, 10, 5) → {result1}")
+    out(f"  Client stores: result = {result1}")
     
     # ─────────────────────────────────────────────────────────────────────────
     # Step 2: 15 × 2 = 30 (client must send result1!)
@@ -261,16 +309,16 @@ def compare_servers():
     #   stores 30                    │ *forgets*
     #
     result2 = send_to_stateless('multiply', result1, 2)['result']
-    print(f"  Request 2: send(multiply, {result1}, 2) → {result2}")
-    print(f"  Client stores: result = {result2}")
+    out(f"  Request 2: send(multiply, {result1}, 2) → {result2}")
+    out(f"  Client stores: result = {result2}")
     
     # ─────────────────────────────────────────────────────────────────────────
     # Step 3: 30 - 3 = 27 (client must send result2!)
     # ─────────────────────────────────────────────────────────────────────────
     result3 = send_to_stateless('subtract', result2, 3)['result']
-    print(f"  Request 3: send(subtract, {result2}, 3) → {result3}")
+    out(f"  Request 3: send(subtract, {result2}, 3) → {result3}")
     
-    print(f"""
+    out(f"""
     ┌────────────────────────────────────────────────────────────┐
     │  Final: {result3}                                              │
     │  Total data sent: 6 numbers (10, 5, 15, 2, 30, 3)         │
@@ -280,10 +328,10 @@ def compare_servers():
     # =========================================================================
     # STATEFUL SERVER TEST
     # =========================================================================
-    print("-"*35)
-    print("STATEFUL SERVER")
-    print("-"*35)
-    print("""
+    out("-"*35)
+    out("STATEFUL SERVER")
+    out("-"*35)
+    out("""
     ┌────────────────────────────────────────────────────────────┐
     │  With STATEFUL server:                                     │
     │  • Server remembers last result                            │
@@ -306,7 +354,7 @@ def compare_servers():
     #
     resp = send_to_stateful('start_session')
     session_id = resp['session_id']
-    print(f"  Session started: {session_id}")
+    out(f"  Session started: {session_id}")
     
     # ─────────────────────────────────────────────────────────────────────────
     # Step 1: 10 + 5 = 15 (server stores result)
@@ -321,8 +369,8 @@ def compare_servers():
     #      │   {result: 15}          │
     #
     resp = send_to_stateful('calculate', session_id, a=10, b=5, op='add')
-    print(f"  Request 1: send(calculate, 10, 5, add) → {resp['result']}")
-    print(f"  Server stores: last_result = {resp['result']}")
+    out(f"  Request 1: send(calculate, 10, 5, add) → {resp['result']}")
+    out(f"  Server stores: last_result = {resp['result']}")
     
     # ─────────────────────────────────────────────────────────────────────────
     # Step 2: use_last × 2 = 30 (client doesn't send 15!)
@@ -338,16 +386,16 @@ def compare_servers():
     #      │   {result: 30}          │
     #
     resp = send_to_stateful('use_last', session_id, b=2, op='multiply')
-    print(f"  Request 2: send(use_last, 2, multiply) → {resp['result']}")
-    print(f"  Server stores: last_result = {resp['result']}")
+    out(f"  Request 2: send(use_last, 2, multiply) → {resp['result']}")
+    out(f"  Server stores: last_result = {resp['result']}")
     
     # ─────────────────────────────────────────────────────────────────────────
     # Step 3: use_last - 3 = 27 (client doesn't send 30!)
     # ─────────────────────────────────────────────────────────────────────────
     resp = send_to_stateful('use_last', session_id, b=3, op='subtract')
-    print(f"  Request 3: send(use_last, 3, subtract) → {resp['result']}")
+    out(f"  Request 3: send(use_last, 3, subtract) → {resp['result']}")
     
-    print(f"""
+    out(f"""
     ┌────────────────────────────────────────────────────────────┐
     │  Final: {resp['result']}                                              │
     │  Total data sent: 4 numbers (10, 5, 2, 3) — 33% less!     │
@@ -357,10 +405,10 @@ def compare_servers():
     # =========================================================================
     # STATEFUL BONUS FEATURES
     # =========================================================================
-    print("-"*35)
-    print("STATEFUL BONUS FEATURES")
-    print("-"*35)
-    print("""
+    out("-"*35)
+    out("STATEFUL BONUS FEATURES")
+    out("-"*35)
+    out("""
     ┌────────────────────────────────────────────────────────────┐
     │  Features ONLY possible with stateful server:              │
     │  • history - see all past operations                       │
@@ -375,23 +423,23 @@ def compare_servers():
     # Feature: History
     # ─────────────────────────────────────────────────────────────────────────
     resp = send_to_stateful('history', session_id)
-    print("  History (stateless can't do this!):")
+    out("  History (stateless can't do this!):")
     for h in resp['history']:
-        print(f"    • {h['operation']} = {h['result']}")
+        out(f"    • {h['operation']} = {h['result']}")
     
     # ─────────────────────────────────────────────────────────────────────────
     # Feature: Undo
     # ─────────────────────────────────────────────────────────────────────────
     resp = send_to_stateful('undo', session_id)
-    print(f"\n  Undo (stateless can't do this!): Removed {resp['undone']}")
+    out(f"\n  Undo (stateless can't do this!): Removed {resp['undone']}")
     
     # ─────────────────────────────────────────────────────────────────────────
     # History after undo
     # ─────────────────────────────────────────────────────────────────────────
     resp = send_to_stateful('history', session_id)
-    print("\n  History after undo:")
+    out("\n  History after undo:")
     for h in resp['history']:
-        print(f"    • {h['operation']} = {h['result']}")
+        out(f"    • {h['operation']} = {h['result']}")
 
 
 # =============================================================================
@@ -160,11 +160,338 @@ SCALING CHALLENGE OF STATEFUL
 ================================================================================
 """
 
-import socket
+import array
+import asyncio
+import collections
+import functools
+import hashlib
+import heapq
+import itertools
 import json
+import os
+import re
+import secrets
+import selectors
+import signal
+import socket
+import struct
 import threading
-import uuid
 import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+# Arithmetic + history bookkeeping; compile with mypyc for a native build
+from calc_ops import apply_op, record, entry_to_dict
+
+# Replies are bytes all the way to sendall(), and the canned ones below are
+# serialized once with whichever codec loads here. orjson produces bytes
+# itself; the json fallback adds the .encode() step.
+#
+# orjson is limited to 64-bit ints, where plain json has no limit, so the
+# orjson versions hand the rare number it can't hold to plain json:
+#
+#   a=10**10, b=10**10 ──► result 10**20 ──► orjson.dumps: TypeError
+#   {"a": 100000000000000000001}    ──► orjson.loads: 1e+20 (silently)
+#
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+    def json_loads(data):
+        # Unframed requests and frames are views into the per-thread recv
+        # buffer; json.loads wants a real bytes object for those
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+else:
+    # 19 digits can already be past int64; shorter runs always fit
+    _LONG_DIGITS = re.compile(rb'[0-9]{19}')
+    
+    def json_loads(data):
+        if _LONG_DIGITS.search(data) is None:
+            return orjson.loads(data)
+        return json.loads(bytes(data))
+    
+    def json_dumps(obj):
+        try:
+            return orjson.dumps(obj)
+        except TypeError:            # Past int64 (or not JSON at all)
+            return json.dumps(obj).encode()
+
+# orjson.JSONDecodeError subclasses it, so one except covers both codecs
+JSONDecodeError = json.JSONDecodeError
+
+# uvloop is a drop-in asyncio event loop built on libuv; the stdlib loop is
+# used when it isn't installed.
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# NumPy (optional) vectorizes the stats reductions over a session's results
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Responses whose shape never changes are serialized once, up front; only the
+# session id is spliced in per request (ids are hex, so never need escaping)
+START_SESSION_HEAD = b'{"session_id":"'
+START_SESSION_TAIL = b'","message":"Session started","server_type":"stateful"}'
+NOTHING_TO_UNDO_HEAD = b'{"session_id":"'
+NOTHING_TO_UNDO_TAIL = b'","error":"Nothing to undo"}'
+NO_PREVIOUS_RESULT = json_dumps({'error': 'No previous result'})
+SESSION_EXPIRED = json_dumps({'error': 'Session expired'})
+SESSION_HEAD = b'{"session_id":"'   # Every per-session response starts so
+
+
+def entry_json(entry):
+    """
+    One history entry as JSON bytes: b'{"operation":"10 add 5","result":15}'
+    
+    A history entry never changes once recorded, but "history" re-sends
+    every entry each time it is asked. Memoizing means each entry is
+    formatted and serialized once and then only copied.
+    
+    Zeros skip the cache: -0.0 == 0.0 with the same type, so one would be
+    served the other's cached "0.0"/"-0.0" text.
+    """
+    if 0 in entry:
+        return json_dumps(entry_to_dict(entry))
+    try:
+        return _entry_json(*entry)
+    except TypeError:                # Unhashable operands (e.g. lists)
+        return json_dumps(entry_to_dict(entry))
+
+
+# typed=True keeps 10 and 10.0 apart (equal hashes, different output)
+@functools.lru_cache(maxsize=4096, typed=True)
+def _entry_json(a, op, b, result):
+    return json_dumps(entry_to_dict((a, op, b, result)))
+
+# ═══════════════════════════════════════════════════════════════════════════
+# FRAMING: every message is a 4-byte big-endian length, then that many bytes
+# ═══════════════════════════════════════════════════════════════════════════
+#
+#   ┌──────────────┬──────────────────────────────────────────┐
+#   │ 00 00 00 2a  │ {"operation":"calculate","a":10,...}     │
+#   │ length = 42  │ 42 bytes of JSON                         │
+#   └──────────────┴──────────────────────────────────────────┘
+#
+# The receiver knows exactly how many bytes to wait for, so a message split
+# across TCP segments (or longer than one recv) is never cut short. Since
+# no frame is over MAX_FRAME_SIZE, a real header always starts with a 00
+# byte; plain JSON never does (it starts with "{", or whitespace), so any
+# other first byte means an old unframed client - answered unframed.
+FRAME_HEADER = struct.Struct('!I')
+MAX_FRAME_SIZE = 1 << 20  # Refuse anything bigger than 1 MiB
+
+
+# Error replies for malformed requests are built once here, not per bad
+# request: junk traffic costs a sendall() of ready-made bytes, nothing more.
+BAD_JSON = json_dumps({'error': 'Invalid JSON'})
+BAD_JSON_FRAME = FRAME_HEADER.pack(len(BAD_JSON)) + BAD_JSON
+UNKNOWN_OPERATION = json_dumps({'error': 'Unknown operation'})
+
+
+def send_frame(sock, payload):
+    """
+    Send one length-prefixed message.
+    
+    payload is bytes or a list of bytes chunks. The header and payload go
+    out together in one sendmsg() (writev) call, so neither a header+body
+    concatenation nor a join of the chunks ever copies the message.
+    """
+    if type(payload) is bytes:
+        send_chunks(sock, [FRAME_HEADER.pack(len(payload)), payload])
+    else:
+        send_chunks(sock, [FRAME_HEADER.pack(sum(map(len, payload))), *payload])
+
+
+# Linux accepts up to 1024 buffers per sendmsg() (IOV_MAX); stay under it
+SENDMSG_MAX_BUFFERS = 512
+
+
+def send_chunks(sock, chunks):
+    """sendall() for a list of buffers, without joining them first."""
+    if type(chunks) is bytes:
+        sock.sendall(chunks)
+        return
+    if not hasattr(sock, 'sendmsg'):     # e.g. Windows
+        sock.sendall(b''.join(chunks))
+        return
+    views = [memoryview(chunk) for chunk in chunks]
+    first = 0
+    while first < len(views):
+        sent = sock.sendmsg(views[first:first + SENDMSG_MAX_BUFFERS])
+        # Skip the buffers that went out whole; trim a partly sent one
+        while sent and sent >= len(views[first]):
+            sent -= len(views[first])
+            first += 1
+        if sent:
+            views[first] = views[first][sent:]
+
+
+def recv_frame(sock, buf=None):
+    """
+    Receive one length-prefixed message; None if the peer closed first.
+    
+    Returns a memoryview of the body. Pass the same bytearray for every
+    message on a connection and recv_into() fills it in place, so reading
+    a message allocates nothing; only a body bigger than buf gets a
+    buffer of its own.
+    """
+    if buf is None:
+        buf = bytearray(FRAME_HEADER.size)
+    view = memoryview(buf)
+    if not _recv_exactly(sock, view[:FRAME_HEADER.size]):
+        return None
+    (length,) = FRAME_HEADER.unpack_from(buf)
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f'Frame too large: {length} bytes')
+    if length > len(buf):
+        view = memoryview(bytearray(length))
+    body = view[:length]
+    if not _recv_exactly(sock, body):
+        return None
+    return body
+
+
+def _recv_exactly(sock, view):
+    """Fill view completely from sock; False if the peer closed first."""
+    while view:
+        n = sock.recv_into(view)
+        if n == 0:
+            return False
+        view = view[n:]
+    return True
+
+
+def summarize(results):
+    """
+    count/sum/mean/min/max of an array('d') of results, skipping NaNs.
+    
+    NaN marks a result that wasn't a plain number (see record()). With
+    NumPy and more than 64 values, the reductions run as vectorized C
+    loops over the array's own buffer (np.frombuffer copies nothing);
+    otherwise a plain Python pass is cheaper than setting that up.
+    """
+    if np is not None and len(results) > 64:
+        values = np.frombuffer(results, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        count = len(values)
+        if not count:
+            return {'count': 0, 'sum': 0.0, 'mean': None, 'min': None, 'max': None}
+        total = float(values.sum())
+        return {'count': count, 'sum': total, 'mean': total / count,
+                'min': float(values.min()), 'max': float(values.max())}
+    
+    values = [x for x in results if x == x]  # NaN != NaN
+    count = len(values)
+    if not count:
+        return {'count': 0, 'sum': 0.0, 'mean': None, 'min': None, 'max': None}
+    total = sum(values)
+    return {'count': count, 'sum': total, 'mean': total / count,
+            'min': min(values), 'max': max(values)}
+
+
+class ConcurrentDict:
+    """
+    A dict split into shards: lock-free reads, per-shard locked writes.
+    
+    ┌─────────────────────────────────────────────────────────────────────────┐
+    │                         SHARDED SESSION MAP                             │
+    ├─────────────────────────────────────────────────────────────────────────┤
+    │                                                                         │
+    │   key ──► hash(key) & 31 ──► shard                                     │
+    │                                                                         │
+    │   ┌──────────┐ ┌──────────┐ ┌──────────┐         ┌──────────┐          │
+    │   │ shard 0  │ │ shard 1  │ │ shard 2  │   ...   │ shard 31 │          │
+    │   │ {...}    │ │ {...}    │ │ {...}    │         │ {...}    │          │
+    │   │ Lock     │ │ Lock     │ │ Lock     │         │ Lock     │          │
+    │   └──────────┘ └──────────┘ └──────────┘         └──────────┘          │
+    │                                                                         │
+    │   READ  (get, in, [])  : no lock at all                                │
+    │   INSERT (setdefault)  : no lock at all (one atomic dict operation)    │
+    │   WRITE (set, pop)     : only that shard's lock                        │
+    │                                                                         │
+    └─────────────────────────────────────────────────────────────────────────┘
+    
+    Why reads need no lock:
+    ───────────────────────
+        A single-key dict lookup or store is one bytecode-level operation
+        that CPython runs while holding the GIL, so a reader sees either the
+        value before a write or the value after it - never half a write.
+        Every read therefore "happens" at one instant between writes, which
+        is exactly what linearizability asks for. Writers still take the
+        shard lock so that compound writes (check-then-insert, pop) on the
+        same shard cannot interleave.
+    """
+    
+    NUM_SHARDS = 32  # Must be a power of two (we mask with NUM_SHARDS - 1)
+    
+    def __init__(self):
+        self._shards = [{} for _ in range(self.NUM_SHARDS)]
+        self._locks = [threading.Lock() for _ in range(self.NUM_SHARDS)]
+    
+    def _index(self, key):
+        return hash(key) & (self.NUM_SHARDS - 1)
+    
+    def get(self, key, default=None):
+        """Lock-free lookup."""
+        return self._shards[self._index(key)].get(key, default)
+    
+    def __getitem__(self, key):
+        return self._shards[self._index(key)][key]
+    
+    def __contains__(self, key):
+        return key in self._shards[self._index(key)]
+    
+    def __setitem__(self, key, value):
+        i = self._index(key)
+        with self._locks[i]:
+            self._shards[i][key] = value
+    
+    def setdefault(self, key, value):
+        """
+        Insert value unless key exists; return whatever is stored.
+        
+        Lock-free: dict.setdefault does its lookup and insert as ONE
+        operation under the GIL (for str keys, whose hash/eq never run
+        Python code). Two threads inserting the same key race safely - the
+        loser just gets the winner's value back, like a compare-and-swap:
+        
+            thread A: setdefault("ab12", 7) ──► 7   (A inserted)
+            thread B: setdefault("ab12", 9) ──► 7   (B sees A's, retries)
+        """
+        return self._shards[self._index(key)].setdefault(key, value)
+    
+    def pop(self, key, default=None):
+        i = self._index(key)
+        with self._locks[i]:
+            return self._shards[i].pop(key, default)
+    
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+    
+    def items(self):
+        """Snapshot of all (key, value) pairs, safe to iterate while writing."""
+        return [item for shard in self._shards for item in list(shard.items())]
+
+
+class _Connection:
+    """Reactor mode: what one client socket has sent and has yet to receive."""
+    
+    __slots__ = ('inbuf', 'outbuf', 'framed', 'closing', 'writing')
+    
+    def __init__(self):
+        self.inbuf = bytearray()  # Request bytes read so far
+        self.outbuf = None        # memoryview of response bytes still unsent
+        self.framed = False
+        self.closing = False      # Close once outbuf is sent
+        self.writing = False      # Registered for EVENT_WRITE
 
 
 class StatefulCalculatorServer:
@@ -193,8 +520,8 @@ class StatefulCalculatorServer:
     │                    └─────────────────────────────┘                      │
     │                                                                         │
     │    Instance variables store CLIENT STATE:                               │
-    │    • self.sessions     - Dict of all client sessions                   │
-    │    • self.sessions_lock - Thread-safe access to sessions               │
+    │    • self.sessions     - ConcurrentDict of all client sessions         │
+    │    • self.locks        - One lock per session slot                     │
     │                                                                         │
     └─────────────────────────────────────────────────────────────────────────┘
     
@@ -203,19 +530,55 @@ class StatefulCalculatorServer:
     - Last result (for chained calculations)
     - Usage statistics (operation count, timing)
     
-    Session structure:
-    ──────────────────
-        sessions = {
-            "<session_id>": {
-                "created_at": <timestamp>,      # When session started
-                "last_result": <number|None>,   # Most recent result
-                "history": [...],               # All operations
-                "operation_count": <int>        # Total ops performed
-            }
-        }
+    Session structure (struct of arrays):
+    ─────────────────────────────────────
+        Instead of one dict per session, each FIELD is one list (a
+        "column"), and a session is one index (a "slot") into all of them:
+        
+        sessions = {"<session_id>": <slot>, ...}
+        
+                         slot 0     slot 1     slot 2
+                        ┌──────────┬──────────┬──────────┐
+        created_at      │ <ts>     │ <ts>     │ <ts>     │  When session started
+        last_touch      │ <ts>     │ <ts>     │ <ts>     │  Last request (for TTL)
+        last_result     │ 15       │ None     │ 42       │  Most recent result
+        history         │ [...]    │ []       │ [...]    │  Last 256 operations
+        results         │ 8 B each │ empty    │ 8 B each │  Their results, as floats
+        operation_count │ 5        │ 0        │ 3        │  Total ops performed
+                        └──────────┴──────────┴──────────┘
+        
+        created_at/last_touch are time.monotonic_ns() integers: cheaper than
+        time.time() floats, and immune to the wall clock being adjusted
+        (which would otherwise make the janitor evict too early or never).
+        
+        history is a ring buffer (deque with maxlen=HISTORY_LIMIT): once it
+        is full, every new operation silently drops the OLDEST entry, so a
+        long-lived session can't grow without bound. Entries are raw
+        (a, op, b, result) tuples; the "10 add 5" label is only formatted
+        when a client actually asks for history or undo.
+        
+        results mirrors history entry-for-entry as one flat array('d') per
+        session: 8 bytes per result instead of a pointer to a boxed int or
+        float, laid out contiguously for numeric scans such as stats.
+        history stays the source of truth for what clients see (exact ints,
+        None for an unknown operator); results holds NaN for anything that
+        isn't a plain number.
+        
+        A request touches just the fields it needs with a plain list index,
+        and the janitor scans only last_touch without dragging the other
+        fields of every session through the CPU cache.
     """
     
-    def __init__(self, host='localhost', port=8002):
+    SWEEP_INTERVAL = 30       # Seconds between janitor passes
+    HISTORY_LIMIT = 256       # Operations remembered per session
+    RECV_BUFFER_SIZE = 4096   # Largest request we accept in one read
+    IDLE_TIMEOUT = 30         # Seconds a kept-alive connection may sit idle
+    SOCKET_BUFFER_SIZE = 256 * 1024  # SO_RCVBUF/SO_SNDBUF per connection
+    OPERATIONS = ('start_session', 'calculate', 'use_last',
+                  'undo', 'history', 'stats')
+    
+    def __init__(self, host='localhost', port=8002, mode='threads', workers=1,
+                 listen_backlog=None, num_acceptors=1):
         """
         Initialize stateful server.
         
@@ -229,34 +592,138 @@ class StatefulCalculatorServer:
             ├── host              : str       (server config)
             ├── port              : int       (server config)
             ├── running           : bool      (server state)
+            ├── mode              : str       ("threads", "asyncio", "reactor")
+            ├── workers           : int       (processes sharing the port)
+            ├── worker_id         : int       (0 = parent, 1.. = forked)
+            ├── listen_backlog    : int       (None = socket.SOMAXCONN)
+            ├── num_acceptors     : int       (threads mode accept threads)
+            ├── pool              : ThreadPoolExecutor (threads mode)
             │
-            ├── sessions          : dict      (CLIENT STATE!)
-            │   │
-            │   ├── "abc123" ─────────────────────────────────────┐
-            │   │   ├── created_at: 1706000000                    │
-            │   │   ├── last_result: 15                           │ Client A's
-            │   │   ├── history: [{op: "10+5", result: 15}, ...]  │ private
-            │   │   └── operation_count: 5                        │ memory
-            │   │                                                  │
-            │   └── "xyz789" ─────────────────────────────────────┐
-            │       ├── created_at: 1706000100                    │
-            │       ├── last_result: 42                           │ Client B's
-            │       ├── history: [{op: "40+2", result: 42}, ...]  │ private
-            │       └── operation_count: 3                        │ memory
+            ├── sessions          : ConcurrentDict (CLIENT STATE!)
+            │   ├── "abc123" ──► slot 0   (Client A)
+            │   └── "xyz789" ──► slot 1   (Client B)
             │
-            └── sessions_lock     : Lock      (thread safety)
+            ├── created_at        : [81200000000, 81300000000]  (columns,
+            ├── last_touch        : [81250000000, 81320000000]   one entry
+            ├── last_result       : [15, 42]                     per slot)
+            ├── history           : [[(10, "add", 5, 15), ...],
+            │                        [(40, "add", 2, 42), ...]]
+            ├── results           : [array('d', [15.0, ...]), ...]
+            ├── operation_count   : [5, 3]
+            ├── _owner            : ["abc123", "xyz789"]  (slot → session_id)
+            ├── _owner_bytes      : [b"abc123", b"xyz789"] (same, as bytes)
+            ├── locks             : [Lock, Lock]          (one per slot)
+            └── _free_slots       : deque     (slots of expired sessions)
+        
+        Per-session locks:
+        ──────────────────
+        
+            One global lock would make every request wait for every other
+            request, even when they touch different sessions. Instead each
+            slot has a lock of its own:
+        
+                "abc123" ──► slot 0 ──► locks[0]  ◄── Client A waits here
+                "xyz789" ──► slot 1 ──► locks[1]  ◄── Client B never does
+        
+            Requests for different sessions never share a lock and run in
+            parallel; requests for the SAME session always take the same
+            lock, so their read-modify-write of history/last_result never
+            interleaves. The lock belongs to the slot, so a recycled slot
+            reuses it instead of allocating a new one.
         """
         self.host = host
         self.port = port
+        self.mode = mode
+        self.workers = workers
+        self.worker_id = 0
+        self.listen_backlog = listen_backlog
+        self.num_acceptors = num_acceptors
+        self._sid_prefix = ''       # workers > 1: "<worker_id:02x>"
+        self._wrong_worker = None   # workers > 1: prebuilt error reply
+        self._children = []         # Parent only: pids of forked workers
         self.running = False
+        self._loop = None           # asyncio mode: the running event loop
+        self._async_stop = None     # asyncio mode: set by stop()
+        self._wakeup_r = None       # threads/reactor: readable once stop()
+        self._wakeup_w = None       #   writes a byte to _wakeup_w
+        self._local = threading.local()  # Per-thread recv buffer + MRU session
+        
+        # threads mode: a fixed pool of handler threads, created in start()
+        self.max_workers = min(32, (os.cpu_count() or 1) * 4)
+        self.pool = None
+        
+        # threads mode: what stop() drains - handlers still running, and
+        # every accepted client socket so it can cut off the stragglers
+        self._inflight = 0
+        self._inflight_cv = threading.Condition()
+        self._live_sockets = weakref.WeakSet()
+        
+        # Operation name -> bound _op_<name> method, looked up once per
+        # request. A new operation is one method plus one OPERATIONS entry.
+        self._ops = {name: getattr(self, '_op_' + name)
+                     for name in self.OPERATIONS}
         
         # ═══════════════════════════════════════════════════════════════════
         # THIS IS THE KEY DIFFERENCE FROM STATELESS!
         # ═══════════════════════════════════════════════════════════════════
         # We maintain a dictionary of ALL client sessions
         # Each session stores that client's history and state
-        self.sessions = {}
-        self.sessions_lock = threading.Lock()  # Thread-safe access
+        self.sessions = ConcurrentDict()  # session_id -> slot
+        
+        # Session fields, one list ("column") per field, indexed by slot
+        self.created_at = []
+        self.last_touch = []
+        self.last_result = []
+        self.history = []
+        self.results = []           # Same entries' results as float arrays
+        self.operation_count = []
+        self._owner = []
+        self._owner_bytes = []      # Encoded once, spliced into responses
+        self.locks = []             # Guards all mutations of the slot
+        
+        # Slots of expired sessions. Reusing them (and their history lists)
+        # avoids growing the columns and allocating for every new client.
+        # deque.append/pop are atomic, so no lock needed.
+        self._free_slots = collections.deque()
+        self._grow_lock = threading.Lock()  # Appending a slot to all columns
+        
+        # Sessions idle for longer than this are evicted by the janitor
+        # thread, so abandoned clients don't leak memory forever.
+        self.session_ttl = 600  # seconds
+        
+        # Hard cap on live sessions: creating one more evicts the least
+        # recently used ones first, so memory is bounded even under a
+        # flood of new clients that the TTL alone would let pile up.
+        self.max_sessions = 100_000
+        self._janitor_wakeup = threading.Event()
+        
+        self._reseed_session_ids()
+    
+    def _reseed_session_ids(self):
+        """Start a fresh secret key (new server, or a newly forked worker)."""
+        self._sid_counter = itertools.count()
+        self._sid_hasher = hashlib.blake2b(key=secrets.token_bytes(32),
+                                           digest_size=4)
+    
+    def _new_sid(self):
+        """
+        Return the next session id: keyed BLAKE2b of a counter, 8 hex chars.
+        
+            counter:  0, 1, 2, ...           (next() is atomic under the GIL)
+                │
+                ▼
+            blake2b(key = 32 secret random bytes, once per process)
+                │
+                ▼
+            "9f3a61c2"
+        
+        Without the key the ids can't be predicted from one another, like
+        secrets.token_hex(4) - but the OS random generator is read once at
+        startup instead of on every start_session.
+        """
+        h = self._sid_hasher.copy()
+        h.update(next(self._sid_counter).to_bytes(8, 'big'))
+        return h.hexdigest()
     
     def create_session(self):
         """
@@ -269,19 +736,19 @@ class StatefulCalculatorServer:
                    │
                    ▼
             ┌─────────────────────────────────────────┐
-            │  1. Generate unique ID (UUID)           │
+            │  1. Generate unique random ID           │
             │     session_id = "a1b2c3d4"            │
             │                                         │
-            │  2. Initialize empty state              │
-            │     {                                   │
-            │       "created_at": now(),              │
-            │       "last_result": None,              │
-            │       "history": [],                    │
-            │       "operation_count": 0              │
-            │     }                                   │
+            │  2. Pick a slot and reset its fields    │
+            │     (a free slot if we have one,        │
+            │      else append one to every column)   │
+            │     created_at[slot]      = now()       │
+            │     last_result[slot]     = None        │
+            │     history[slot]         = deque()     │
+            │     operation_count[slot] = 0           │
             │                                         │
             │  3. Store in sessions dict              │
-            │     sessions["a1b2c3d4"] = state       │
+            │     sessions["a1b2c3d4"] = slot        │
             └─────────────────────────────────────────┘
                    │
                    ▼
@@ -290,19 +757,148 @@ class StatefulCalculatorServer:
         
         Returns:
         ────────
-        str : Unique session identifier (first 8 chars of UUID)
+        str : Unique session identifier (8 unpredictable hex chars)
         """
-        session_id = str(uuid.uuid4())[:8]
+        if self.max_sessions and len(self.sessions) >= self.max_sessions:
+            self._evict_lru()
         
-        self.sessions[session_id] = {
-            'created_at': time.time(),
-            'last_result': None,      # Will store most recent result
-            'history': [],            # Will store all operations
-            'operation_count': 0      # Will count total operations
-        }
+        now = time.monotonic_ns()
+        
+        try:
+            # Recycled slot: reset it to the same empty state
+            slot = self._free_slots.pop()
+            self.created_at[slot] = now
+            self.last_touch[slot] = now       # Refreshed on every request
+            self.last_result[slot] = None     # Will store most recent result
+            self.history[slot].clear()        # Will store all operations
+            del self.results[slot][:]
+            self.operation_count[slot] = 0    # Will count total operations
+        except IndexError:
+            with self._grow_lock:
+                slot = len(self.created_at)
+                self.created_at.append(now)
+                self.last_touch.append(now)
+                self.last_result.append(None)
+                self.history.append(
+                    collections.deque(maxlen=self.HISTORY_LIMIT))
+                self.results.append(array.array('d'))
+                self.operation_count.append(0)
+                self._owner.append(None)
+                self._owner_bytes.append(None)
+                self.locks.append(threading.Lock())
+        
+        # 32 bits can collide once there are many sessions, so insert with
+        # setdefault (an atomic insert-if-absent, no lock taken) and draw
+        # again if another session already owns the id
+        while True:
+            session_id = self._sid_prefix + self._new_sid()
+            if self.sessions.setdefault(session_id, slot) == slot:
+                break
+        self._owner_bytes[slot] = session_id.encode()
+        self._owner[slot] = session_id
         
         return session_id
     
+    def expire_session(self, session_id, seen_touch=None):
+        """
+        Forget a session and put its slot on the free list.
+        
+        The slot is cleared under the session's lock, so no handler
+        is in the middle of updating it. A handler that looked the slot up
+        just before it expired takes that lock afterwards, finds _owner no
+        longer names its session and answers "Session expired" - it never
+        writes into the new session that reuses the slot.
+        
+            handler (session A)            expire_session(A)
+            ───────────────────            ─────────────────
+            slot = sessions[A]
+                                           with locks[slot]: _owner = None
+                                           create_session() B ─► same slot
+            with locks[slot]:
+                _owner[slot] != A ──► SESSION_EXPIRED
+        
+        seen_touch: the last_touch value the caller based its decision on
+        (janitor, LRU). If a request touched the session since then, it is
+        no longer idle and is left alone.
+        
+        Returns:
+        ────────
+        bool : True if the session was expired
+        """
+        slot = self.sessions.get(session_id)
+        if slot is None:
+            return False
+        
+        with self.locks[slot]:
+            if self._owner[slot] != session_id:
+                return False  # Already expired; the slot may be reused
+            if seen_touch is not None and self.last_touch[slot] != seen_touch:
+                return False  # Used since the caller's snapshot: not idle
+            self.sessions.pop(session_id)
+            self.history[slot].clear()
+            del self.results[slot][:]
+            self.last_result[slot] = None
+            self.last_touch[slot] = float('inf')  # Never "idle" while free
+            self._owner[slot] = None
+        self._free_slots.append(slot)
+        return True
+    
+    def _sweep(self):
+        """
+        Evict every session that has been idle for longer than session_ttl.
+        
+            now - last_touch > session_ttl ?  ──YES──►  expire_session()
+        
+        Only the last_touch column is scanned. Free slots hold +inf there,
+        so they are never picked.
+        
+        Returns:
+        ────────
+        int : Number of sessions evicted
+        """
+        deadline = time.monotonic_ns() - self.session_ttl * 1_000_000_000
+        evicted = 0
+        for slot, touched in enumerate(list(self.last_touch)):
+            if touched < deadline:
+                session_id = self._owner[slot]
+                if session_id is not None:
+                    evicted += self.expire_session(session_id, touched)
+        return evicted
+    
+    def _evict_lru(self):
+        """
+        Make room under max_sessions by evicting the least recently used.
+        
+            last_touch:  [t5, t1, inf, t9, t2, ...]
+                              ▲         ▲
+                         oldest 1/16 ──► expire_session()
+        
+        Evicting a batch at once (1/16 of the cap) means the column scan
+        runs once per batch of new sessions, not once per new session.
+        
+        Returns:
+        ────────
+        int : Number of sessions evicted
+        """
+        touches = list(self.last_touch)
+        batch = max(1, self.max_sessions // 16)
+        evicted = 0
+        for slot in heapq.nsmallest(batch, range(len(touches)),
+                                    key=touches.__getitem__):
+            session_id = self._owner[slot]
+            if session_id is not None:
+                evicted += self.expire_session(session_id, touches[slot])
+        return evicted
+    
+    def _janitor(self):
+        """Background thread: run _sweep() every SWEEP_INTERVAL seconds."""
+        while self.running:
+            self._janitor_wakeup.wait(self.SWEEP_INTERVAL)
+            if self.running:
+                evicted = self._sweep()
+                if evicted:
+                    print(f"[Stateful Server] Evicted {evicted} idle session(s)")
+    
     def get_session(self, session_id):
         """
         Get existing session or create new one.
@@ -328,19 +924,297 @@ class StatefulCalculatorServer:
         
         Thread safety:
         ──────────────
-            with self.sessions_lock:  # Only one thread at a time
-                # ... access self.sessions ...
+            self.sessions.get(session_id)  # No lock: see ConcurrentDict
+            self.create_session()          # Locks one shard to insert
+        
+        Fast path:
+        ──────────
+            Clients usually send several requests in a row for the same
+            session, so each thread remembers the last (session_id, slot)
+            it resolved. A repeat request skips the shard lookup entirely.
+            The cached slot is only trusted while _owner[slot] still names
+            this session - after an eviction the slot may belong to someone
+            else, and we fall back to the normal lookup.
         
         Returns:
         ────────
-        tuple : (session_id, session_dict)
+        tuple : (session_id, slot)
         """
-        with self.sessions_lock:
-            if session_id and session_id in self.sessions:
-                return session_id, self.sessions[session_id]
-            else:
-                new_id = self.create_session()
-                return new_id, self.sessions[new_id]
+        if session_id:
+            local = self._local
+            slot = getattr(local, 'slot', None)
+            if slot is not None and getattr(local, 'sid', None) == session_id \
+                    and self._owner[slot] == session_id:
+                return session_id, slot
+            
+            slot = self.sessions.get(session_id)
+            if slot is not None:
+                local.sid, local.slot = session_id, slot
+                return session_id, slot
+        
+        new_id = self.create_session()
+        return new_id, self.sessions[new_id]
+    
+    def process_request(self, request):
+        """
+        Run one parsed request against its session and encode the response.
+        
+        This is the transport-independent core: the threaded handler and
+        the asyncio handler both feed it a request dict and send back
+        the bytes it returns. Handlers return either a dict (serialized
+        here), ready-made bytes for responses with a fixed shape, or a
+        list of bytes chunks that the transport sends without joining
+        (a long history).
+        
+        Dispatch is a single dict lookup in self._ops (built once in
+        __init__) instead of walking an if/elif chain of string compares:
+        
+            self._ops = {
+                'start_session': self._op_start_session,
+                'calculate':     self._op_calculate,
+                ...
+            }
+            handler = self._ops.get(operation)   # O(1), one hash
+        
+        Supported operations:
+        ─────────────────────
+        
+            ┌───────────────────┬────────────────────────────────────────────┐
+            │ Operation         │ Description                                │
+            ├───────────────────┼────────────────────────────────────────────┤
+            │ start_session     │ Create new session, return session_id     │
+            │ calculate         │ a OP b, store result in session           │
+            │ use_last          │ last_result OP b (use stored result!)     │
+            │ undo              │ Remove last operation from history        │
+            │ history           │ Return operation history (last 256)       │
+            │ stats             │ Session statistics + sum/mean/min/max     │
+            └───────────────────┴────────────────────────────────────────────┘
+        """
+        operation = request.get('operation')
+        handler = self._ops.get(operation)
+        if handler is None:
+            # Rejected before the session lookup, so junk requests never
+            # create (or refresh) a session
+            return UNKNOWN_OPERATION
+        
+        # ─────────────────────────────────────────────────────────────────
+        # STEP 3: Get or create session
+        # ─────────────────────────────────────────────────────────────────
+        # This is THE KEY STATEFUL BEHAVIOR!
+        # We look up (or create) the client's persistent session
+        session_id = request.get('session_id')
+        if self._sid_prefix and type(session_id) is str and session_id \
+                and not session_id.startswith(self._sid_prefix):
+            # Another worker process owns this session (see start()). A
+            # non-string id (e.g. 123) is no worker's: looked up as unknown
+            return self._wrong_worker
+        
+        # Same lookup as get_session(), inlined: this runs on every request,
+        # and skipping the call saves a frame plus a (session_id, slot) tuple
+        slot = None
+        if session_id:
+            local = self._local
+            slot = getattr(local, 'slot', None)
+            if slot is None or getattr(local, 'sid', None) != session_id \
+                    or self._owner[slot] != session_id:
+                slot = self.sessions.get(session_id)
+                if slot is not None:
+                    local.sid, local.slot = session_id, slot
+        if slot is None:
+            session_id = self.create_session()
+            slot = self.sessions[session_id]
+        if self._owner[slot] == session_id:  # not a slot freed meanwhile
+            self.last_touch[slot] = time.monotonic_ns()  # Keeps the janitor away
+        
+        print(f"[Stateful] Session {session_id}: {operation}")
+        
+        response = handler(session_id, slot, request)
+        return json_dumps(response) if type(response) is dict else response
+    
+    def _op_start_session(self, session_id, slot, request):
+        """start_session: hand the session id back to the client."""
+        #
+        #   Client                              Server
+        #      │                                   │
+        #      │─── "start_session" ──────────────►│
+        #      │                                   │ Create session
+        #      │◄── session_id: "abc123" ──────────│
+        #      │                                   │
+        #
+        # Same bytes as json_dumps({'session_id': ..., 'message': ...,
+        # 'server_type': ...}) without building or serializing a dict
+        with self.locks[slot]:
+            if self._owner[slot] != session_id:
+                return SESSION_EXPIRED  # evicted before we got here
+            owner = self._owner_bytes[slot]
+        return START_SESSION_HEAD + owner + START_SESSION_TAIL
+    
+    def _op_use_last(self, session_id, slot, request):
+        """use_last: last_result OP b (ONLY POSSIBLE WITH STATE!)."""
+        #
+        #   ┌────────────────────────────────────────────────────────┐
+        #   │  This operation is IMPOSSIBLE in stateless server!    │
+        #   │                                                        │
+        #   │  Client sends:  { "operation": "use_last",            │
+        #   │                   "b": 2,                              │
+        #   │                   "op": "multiply" }                   │
+        #   │                                                        │
+        #   │  Server recalls: last_result = 15 (from session!)     │
+        #   │  Server computes: 15 × 2 = 30                         │
+        #   │  Server stores: last_result = 30                      │
+        #   │                                                        │
+        #   │  Client didn't send "15" - server remembered it!      │
+        #   └────────────────────────────────────────────────────────┘
+        #
+        b = request.get('b')
+        op = request.get('op', 'add')
+        
+        # Read AND update under ONE acquisition of the session's lock, so
+        # two requests for the same session can't both read the same
+        # last_result. Only the read-compute-write is inside; building the
+        # response happens after the lock is released.
+        with self.locks[slot]:
+            if self._owner[slot] != session_id:
+                return SESSION_EXPIRED  # slot freed (and maybe reused)
+            a = self.last_result[slot]  # RETRIEVE FROM SESSION!
+        
+            if a is not None:
+                # Calculate using stored value
+                result = apply_op(op, a, b)
+                # UPDATE SESSION STATE
+                record(self.history, self.results, self.last_result,
+                       self.operation_count, slot, a, op, b, result)
+        
+        if a is None:
+            return NO_PREVIOUS_RESULT
+        return {
+            'session_id': session_id,
+            'operation': f"last_result({a}) {op} {b}",
+            'result': result
+        }
+    
+    def _op_calculate(self, session_id, slot, request):
+        """calculate: a OP b, remembered in the session."""
+        a = request.get('a')
+        b = request.get('b')
+        op = request.get('op', 'add')
+        
+        result = apply_op(op, a, b)
+        
+        # UPDATE SESSION STATE (stateless server wouldn't do this!)
+        # history, last_result and operation_count change together under a
+        # single lock acquisition
+        with self.locks[slot]:
+            if self._owner[slot] != session_id:
+                return SESSION_EXPIRED  # slot freed (and maybe reused)
+            record(self.history, self.results, self.last_result,
+                   self.operation_count, slot, a, op, b, result)
+            owner = self._owner_bytes[slot]
+        
+        # {"session_id": ..., "result": ...} from prebuilt fragments
+        return b''.join((SESSION_HEAD, owner, b'","result":',
+                         json_dumps(result), b'}'))
+    
+    def _op_undo(self, session_id, slot, request):
+        """undo: drop the last operation (ONLY POSSIBLE WITH STATE!)."""
+        #
+        #   ┌────────────────────────────────────────────────────────┐
+        #   │  UNDO - only possible because we have history!        │
+        #   │                                                        │
+        #   │  Before undo:                                          │
+        #   │    history = [{op: "10+5", result: 15},               │
+        #   │               {op: "15*2", result: 30}]               │
+        #   │    last_result = 30                                    │
+        #   │                                                        │
+        #   │  After undo:                                           │
+        #   │    history = [{op: "10+5", result: 15}]               │
+        #   │    last_result = 15  (restored!)                      │
+        #   │                                                        │
+        #   │  Stateless server: "Undo what? I have no history!"   │
+        #   └────────────────────────────────────────────────────────┘
+        #
+        with self.locks[slot]:
+            if self._owner[slot] != session_id:
+                return SESSION_EXPIRED  # slot freed (and maybe reused)
+            owner = self._owner_bytes[slot]
+            removed = None
+            if self.history[slot]:
+                removed = self.history[slot].pop()
+                self.results[slot].pop()
+        
+                # Restore previous last_result (entries are (a, op, b, result))
+                if self.history[slot]:
+                    self.last_result[slot] = self.history[slot][-1][3]
+                else:
+                    self.last_result[slot] = None
+            last_result = self.last_result[slot]
+        
+        if removed is None:
+            return NOTHING_TO_UNDO_HEAD + owner + NOTHING_TO_UNDO_TAIL
+        # Formatted outside the lock; usually already in entry_json's cache
+        return b''.join((SESSION_HEAD, owner, b'","undone":',
+                         entry_json(removed), b',"last_result":',
+                         json_dumps(last_result), b'}'))
+    
+    def _op_history(self, session_id, slot, request):
+        """history: all recorded operations (ONLY POSSIBLE WITH STATE!)."""
+        #
+        #   Stateless server: "History? I just met you!"
+        #   Stateful server:  "Let me show you everything we've done..."
+        #
+        # Take a consistent snapshot under the lock, format it after
+        with self.locks[slot]:
+            if self._owner[slot] != session_id:
+                return SESSION_EXPIRED  # slot freed (and maybe reused)
+            owner = self._owner_bytes[slot]
+            entries = tuple(self.history[slot])
+            operation_count = self.operation_count[slot]
+            last_result = self.last_result[slot]
+        
+        # Each entry's bytes come from entry_json's cache, so repeated
+        # history requests copy bytes instead of re-serializing N dicts.
+        # They're returned as a list of chunks, never joined into one
+        # big response: the socket sends them straight from the cache.
+        #
+        #   [b'{"session_id":"', b'ab12cd34', b'","history":[',
+        #    entry 1, b',', entry 2, ..., b'],"operation_count":', ...]
+        #
+        chunks = [SESSION_HEAD, owner, b'","history":[']
+        for entry in entries:
+            chunks.append(entry_json(entry))
+            chunks.append(b',')
+        if entries:
+            chunks.pop()                 # No comma after the last entry
+        chunks += (b'],"operation_count":', b'%d' % operation_count,
+                   b',"last_result":', json_dumps(last_result), b'}')
+        return chunks
+    
+    def _op_stats(self, session_id, slot, request):
+        """stats: session statistics (ONLY POSSIBLE WITH STATE!)."""
+        # Copy the column under the lock (one memcpy): a NumPy view of the
+        # live array would stop record() from appending to it
+        with self.locks[slot]:
+            if self._owner[slot] != session_id:
+                return SESSION_EXPIRED  # slot freed (and maybe reused)
+            results = array.array('d', self.results[slot])
+            operation_count = self.operation_count[slot]
+            created_at = self.created_at[slot]
+        
+        return {
+            'session_id': session_id,
+            'total_sessions': len(self.sessions),
+            'your_operations': operation_count,
+            'session_age': (time.monotonic_ns() - created_at) / 1e9,
+            'results': summarize(results)
+        }
+    
+    def _recv_buffer(self):
+        """Return this thread's receive buffer, creating it on first use."""
+        try:
+            return self._local.buf
+        except AttributeError:
+            buf = self._local.buf = bytearray(self.RECV_BUFFER_SIZE)
+            return buf
     
     def handle_client(self, client_socket, address):
         """
@@ -367,216 +1241,70 @@ class StatefulCalculatorServer:
         │                                      │                              │
         │                                      ▼                              │
         │  4. UPDATE SESSION ─► 5. RESPOND ─► 6. CLOSE (but keep session!)   │
+        │                        ▲       │                                    │
+        │                        └───────┘  framed: next request, same socket │
         │                                                                     │
         └─────────────────────────────────────────────────────────────────────┘
-        
-        Supported operations:
-        ─────────────────────
-        
-            ┌───────────────────┬────────────────────────────────────────────┐
-            │ Operation         │ Description                                │
-            ├───────────────────┼────────────────────────────────────────────┤
-            │ start_session     │ Create new session, return session_id     │
-            │ calculate         │ a OP b, store result in session           │
-            │ use_last          │ last_result OP b (use stored result!)     │
-            │ undo              │ Remove last operation from history        │
-            │ history           │ Return complete operation history         │
-            │ stats             │ Return session statistics                 │
-            └───────────────────┴────────────────────────────────────────────┘
         """
+        framed = False
+        with self._inflight_cv:
+            self._inflight += 1
         try:
-            # ─────────────────────────────────────────────────────────────────
-            # STEP 1-2: Receive and parse request
-            # ─────────────────────────────────────────────────────────────────
-            data = client_socket.recv(1024).decode()
-            request = json.loads(data)
-            
-            # ─────────────────────────────────────────────────────────────────
-            # STEP 3: Get or create session
-            # ─────────────────────────────────────────────────────────────────
-            # This is THE KEY STATEFUL BEHAVIOR!
-            # We look up (or create) the client's persistent session
-            session_id, session = self.get_session(request.get('session_id'))
-            
-            operation = request.get('operation')
-            
-            print(f"[Stateful] Session {session_id}: {operation}")
-            
-            # ─────────────────────────────────────────────────────────────────
-            # OPERATION: start_session
-            # ─────────────────────────────────────────────────────────────────
-            if operation == 'start_session':
-                #
-                #   Client                              Server
-                #      │                                   │
-                #      │─── "start_session" ──────────────►│
-                #      │                                   │ Create session
-                #      │◄── session_id: "abc123" ──────────│
-                #      │                                   │
-                #
-                response = {
-                    'session_id': session_id,
-                    'message': 'Session started',
-                    'server_type': 'stateful'
-                }
-            
-            # ─────────────────────────────────────────────────────────────────
-            # OPERATION: use_last (ONLY POSSIBLE WITH STATE!)
-            # ─────────────────────────────────────────────────────────────────
-            elif operation == 'use_last':
-                #
-                #   ┌────────────────────────────────────────────────────────┐
-                #   │  This operation is IMPOSSIBLE in stateless server!    │
-                #   │                                                        │
-                #   │  Client sends:  { "operation": "use_last",            │
-                #   │                   "b": 2,                              │
-                #   │                   "op": "multiply" }                   │
-                #   │                                                        │
-                #   │  Server recalls: last_result = 15 (from session!)     │
-                #   │  Server computes: 15 × 2 = 30                         │
-                #   │  Server stores: last_result = 30                      │
-                #   │                                                        │
-                #   │  Client didn't send "15" - server remembered it!      │
-                #   └────────────────────────────────────────────────────────┘
-                #
-                a = session['last_result']  # RETRIEVE FROM SESSION!
-                b = request.get('b')
-                op = request.get('op', 'add')
-                
-                if a is None:
-                    response = {'error': 'No previous result'}
-                else:
-                    # Calculate using stored value
-                    if op == 'add':
-                        result = a + b
-                    elif op == 'multiply':
-                        result = a * b
-                    elif op == 'subtract':
-                        result = a - b
-                    else:
-                        result = None
-                    
-                    # UPDATE SESSION STATE
-                    session['history'].append({
-                        'operation': f"{a} {op} {b}",
-                        'result': result
-                    })
-                    session['last_result'] = result
-                    session['operation_count'] += 1
-                    
-                    response = {
-                        'session_id': session_id,
-                        'operation': f"last_result({a}) {op} {b}",
-                        'result': result
-                    }
+            # Small request/response messages: send each one immediately
+            # instead of letting Nagle's algorithm hold it back ~40 ms
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client_socket.settimeout(self.IDLE_TIMEOUT)
             
             # ─────────────────────────────────────────────────────────────────
-            # OPERATION: calculate (normal calculation)
-            # ─────────────────────────────────────────────────────────────────
-            elif operation == 'calculate':
-                a = request.get('a')
-                b = request.get('b')
-                op = request.get('op', 'add')
-                
-                if op == 'add':
-                    result = a + b
-                elif op == 'multiply':
-                    result = a * b
-                elif op == 'subtract':
-                    result = a - b
-                else:
-                    result = None
-                
-                # UPDATE SESSION STATE (stateless server wouldn't do this!)
-                session['history'].append({
-                    'operation': f"{a} {op} {b}",
-                    'result': result
-                })
-                session['last_result'] = result  # Store for "use_last"
-                session['operation_count'] += 1
-                
-                response = {
-                    'session_id': session_id,
-                    'result': result
-                }
-            
-            # ─────────────────────────────────────────────────────────────────
-            # OPERATION: undo (ONLY POSSIBLE WITH STATE!)
-            # ─────────────────────────────────────────────────────────────────
-            elif operation == 'undo':
-                #
-                #   ┌────────────────────────────────────────────────────────┐
-                #   │  UNDO - only possible because we have history!        │
-                #   │                                                        │
-                #   │  Before undo:                                          │
-                #   │    history = [{op: "10+5", result: 15},               │
-                #   │               {op: "15*2", result: 30}]               │
-                #   │    last_result = 30                                    │
-                #   │                                                        │
-                #   │  After undo:                                           │
-                #   │    history = [{op: "10+5", result: 15}]               │
-                #   │    last_result = 15  (restored!)                      │
-                #   │                                                        │
-                #   │  Stateless server: "Undo what? I have no history!"   │
-                #   └────────────────────────────────────────────────────────┘
-                #
-                if session['history']:
-                    removed = session['history'].pop()
-                    
-                    # Restore previous last_result
-                    if session['history']:
-                        session['last_result'] = session['history'][-1]['result']
-                    else:
-                        session['last_result'] = None
-                    
-                    response = {
-                        'session_id': session_id,
-                        'undone': removed,
-                        'last_result': session['last_result']
-                    }
-                else:
-                    response = {
-                        'session_id': session_id,
-                        'error': 'Nothing to undo'
-                    }
-            
-            # ─────────────────────────────────────────────────────────────────
-            # OPERATION: history (ONLY POSSIBLE WITH STATE!)
+            # STEP 1-2: Receive and parse request
             # ─────────────────────────────────────────────────────────────────
-            elif operation == 'history':
-                #
-                #   Stateless server: "History? I just met you!"
-                #   Stateful server:  "Let me show you everything we've done..."
-                #
-                response = {
-                    'session_id': session_id,
-                    'history': session['history'],
-                    'operation_count': session['operation_count'],
-                    'last_result': session['last_result']
-                }
+            # recv_into() fills this thread's reusable buffer in place, so
+            # no new bytes object is allocated per request. Peek at the
+            # first byte to tell a framed request from a plain JSON one.
+            buf = self._recv_buffer()
+            n = client_socket.recv_into(buf, 1, socket.MSG_PEEK)
+            framed = n > 0 and buf[0] == 0   # 00: high byte of a length
+            if not framed:
+                n = client_socket.recv_into(buf)
+                request = json_loads(memoryview(buf)[:n])
+                send_chunks(client_socket, self.process_request(request))
+                return                       # Unframed: one request only
             
             # ─────────────────────────────────────────────────────────────────
-            # OPERATION: stats (ONLY POSSIBLE WITH STATE!)
-            # ─────────────────────────────────────────────────────────────────
-            elif operation == 'stats':
-                response = {
-                    'session_id': session_id,
-                    'total_sessions': len(self.sessions),
-                    'your_operations': session['operation_count'],
-                    'session_age': time.time() - session['created_at']
-                }
-            
-            else:
-                response = {'error': f'Unknown operation: {operation}'}
-            
+            # STEP 3-5: Look up the session, run the operation, respond -
+            #           then keep going while the client keeps sending
             # ─────────────────────────────────────────────────────────────────
-            # STEP 5: Send response
-            # ─────────────────────────────────────────────────────────────────
-            client_socket.send(json.dumps(response).encode())
+            #
+            #   One TCP handshake for a whole conversation instead of one
+            #   per request. The loop ends when the client closes its side
+            #   (recv_frame() returns None) or stays idle for IDLE_TIMEOUT,
+            #   which frees this pool thread for someone else. After stop()
+            #   the current request is answered, then the connection closed.
+            #
+            while self.running:
+                body = recv_frame(client_socket, buf)
+                if body is None:
+                    break
+                try:
+                    request = json_loads(body)
+                except JSONDecodeError:
+                    # The frame itself was whole, so the next one starts
+                    # right after it: answer and keep the connection
+                    client_socket.sendall(BAD_JSON_FRAME)
+                    continue
+                send_frame(client_socket, self.process_request(request))
             
+        except socket.timeout:
+            pass                             # Idle keep-alive client
+        except JSONDecodeError:
+            client_socket.sendall(BAD_JSON)  # Unframed request, not JSON
         except Exception as e:
             print(f"[Stateful] Error: {e}")
-            client_socket.send(json.dumps({'error': str(e)}).encode())
+            error = json_dumps({'error': str(e)})
+            if framed:
+                send_frame(client_socket, error)
+            else:
+                client_socket.send(error)
         finally:
             # ─────────────────────────────────────────────────────────────────
             # STEP 6: Close connection BUT KEEP SESSION!
@@ -595,6 +1323,460 @@ class StatefulCalculatorServer:
             #   └────────────────────────────────────────────────────────────┘
             #
             client_socket.close()
+            with self._inflight_cv:
+                self._live_sockets.discard(client_socket)
+                self._inflight -= 1
+                if not self._inflight:
+                    self._inflight_cv.notify_all()  # stop() may be waiting
+    
+    async def handle_client_async(self, reader, writer):
+        """
+        asyncio version of handle_client: same steps, no thread.
+        
+        Every connection is a coroutine on ONE event-loop thread, so
+        thousands of idle clients cost a few KB each instead of an OS
+        thread each (asyncio already sets TCP_NODELAY on every TCP
+        connection). process_request() never awaits, so it runs start to
+        finish without any other handler interleaving - the session locks
+        it takes are never contended in this mode.
+        """
+        framed = False
+        try:
+            # StreamReader is buffered, so this one byte costs no syscall
+            first = await reader.read(1)
+            framed = first == b'\x00'       # High byte of a length prefix
+            if not framed:
+                data = first + await reader.read(self.RECV_BUFFER_SIZE)
+                response = self.process_request(json_loads(data))
+                if type(response) is bytes:
+                    writer.write(response)
+                else:
+                    writer.writelines(response)
+                await writer.drain()
+                return                       # Unframed: one request only
+            
+            # Keep-alive: framed requests until the client closes. Idle
+            # coroutines are cheap, so (unlike a pool thread) no timeout.
+            header = first + await reader.readexactly(FRAME_HEADER.size - 1)
+            while True:
+                (length,) = FRAME_HEADER.unpack(header)
+                if length > MAX_FRAME_SIZE:
+                    raise ValueError(f'Frame too large: {length} bytes')
+                body = await reader.readexactly(length)
+                try:
+                    response = self.process_request(json_loads(body))
+                    if type(response) is bytes:
+                        writer.write(FRAME_HEADER.pack(len(response)) + response)
+                    else:
+                        writer.write(FRAME_HEADER.pack(sum(map(len, response))))
+                        writer.writelines(response)
+                except JSONDecodeError:
+                    writer.write(BAD_JSON_FRAME)     # Keep the connection
+                await writer.drain()
+                try:
+                    header = await reader.readexactly(FRAME_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break                    # Client closed its side
+        except JSONDecodeError:
+            writer.write(BAD_JSON)           # Unframed request, not JSON
+        except Exception as e:
+            print(f"[Stateful] Error: {e}")
+            error = json_dumps({'error': str(e)})
+            if framed:
+                error = FRAME_HEADER.pack(len(error)) + error
+            writer.write(error)
+        finally:
+            writer.close()
+    
+    async def serve(self, server_socket=None):
+        """
+        Run the asyncio server on the current event loop until stop().
+        
+        start() with mode="asyncio" runs this on a fresh loop (uvloop if
+        installed). Code that already has a loop can run it directly:
+        
+            asyncio.run(server.serve())
+        
+        Everything - accepting, every connection's coroutine and the
+        idle-session janitor - runs on the loop's one thread, so session
+        state is only ever touched by that thread.
+        """
+        standalone = server_socket is None
+        if standalone:                   # Not called from start()
+            self.running = True
+            self._async_stop = asyncio.Event()
+            self._loop = asyncio.get_running_loop()
+            server_socket = self._listen()
+        
+        janitor = asyncio.create_task(self._janitor_async())
+        try:
+            server = await asyncio.start_server(
+                self.handle_client_async, sock=server_socket
+            )
+            async with server:
+                await self._async_stop.wait()
+        finally:
+            janitor.cancel()
+            if standalone:
+                server_socket.close()
+                self._loop = None
+    
+    async def _janitor_async(self):
+        """_janitor() as a task on the event loop instead of a thread."""
+        while self.running:
+            try:
+                await asyncio.wait_for(self._async_stop.wait(),
+                                       self.SWEEP_INTERVAL)
+            except asyncio.TimeoutError:
+                evicted = self._sweep()
+                if evicted:
+                    print(f"[Stateful Server] Evicted {evicted} idle session(s)")
+    
+    def _serve_threads(self, server_socket):
+        """
+        Accept connections and hand each one to a pooled handler thread.
+        
+        Bounded pool:
+        ─────────────
+        
+            Starting a thread per connection costs a thread create/destroy
+            every request, and a burst of clients gets a burst of threads.
+            Instead max_workers threads are created once and reused. A
+            semaphore with max_workers * 2 permits caps how many accepted
+            connections may be running or queued:
+        
+                accept loop ──acquire()──► pool.submit(handle_client)
+                    ▲                                 │
+                    └──────── release() ◄── done ─────┘
+        
+            When every permit is taken, the loop stops calling accept() and
+            new clients wait in the kernel's listen backlog - backpressure
+            instead of an ever-growing in-memory queue.
+        
+        Several acceptors:
+        ──────────────────
+        
+            One thread calling accept() can become the bottleneck under a
+            flood of short connections. With num_acceptors = N (Linux,
+            SO_REUSEPORT) N sockets are bound to the same port, each with
+            its own accept thread; the kernel hashes incoming connections
+            across them and all N feed the same pool and permits.
+        """
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                       thread_name_prefix='stateful')
+        permits = threading.BoundedSemaphore(self.max_workers * 2)
+        
+        # Extra acceptors: one more SO_REUSEPORT socket + thread each
+        extra = []
+        if self.num_acceptors > 1 and hasattr(socket, 'SO_REUSEPORT'):
+            for _ in range(self.num_acceptors - 1):
+                sock = self._listen()
+                thread = threading.Thread(target=self._accept_loop,
+                                          args=(sock, permits), daemon=True)
+                thread.start()
+                extra.append((sock, thread))
+        
+        try:
+            self._accept_loop(server_socket, permits)
+        finally:
+            for sock, thread in extra:
+                thread.join()
+                sock.close()
+            self.pool.shutdown(wait=True)  # Let in-flight requests finish
+            self.pool = None
+    
+    def _accept_loop(self, server_socket, permits):
+        """
+        One acceptor: accept() and submit to the shared pool until stop().
+        
+        Instead of a 1-second accept() timeout just to re-check
+        self.running, the thread sleeps in select() on two sockets:
+        
+            server_socket ──► a client is waiting  ──► accept()
+            _wakeup_r     ──► stop() was called    ──► leave the loop
+        
+        so it costs nothing while idle and notices stop() immediately.
+        """
+        release = lambda future: permits.release()
+        server_socket.setblocking(False)
+        sel = selectors.DefaultSelector()
+        sel.register(server_socket, selectors.EVENT_READ)
+        sel.register(self._wakeup_r, selectors.EVENT_READ)
+        try:
+            while self.running:
+                if not permits.acquire(timeout=1):
+                    continue             # All busy: re-check self.running
+                sel.select()
+                try:
+                    client_socket, address = server_socket.accept()
+                except BlockingIOError:  # Woken by stop(), not a client
+                    permits.release()
+                    continue
+                with self._inflight_cv:
+                    self._live_sockets.add(client_socket)
+                future = self.pool.submit(self.handle_client,
+                                          client_socket, address)
+                future.add_done_callback(release)
+        finally:
+            sel.close()
+    
+    def _serve_reactor(self, server_socket):
+        """
+        Serve every client from ONE thread with a readiness selector.
+        
+        Event loop:
+        ───────────
+        
+            ┌──────────────────────────────────────────────────────────────┐
+            │  sel.select()  ◄── epoll (Linux) / kqueue (BSD, macOS)      │
+            │      │                                                       │
+            │      ├── listening socket readable ──► accept, register     │
+            │      ├── client readable  ──► recv, append to inbuf,        │
+            │      │                        complete? process + send      │
+            │      └── client writable  ──► send rest of outbuf           │
+            └──────────────────────────────────────────────────────────────┘
+        
+            A framed connection stays open for the next request once its
+            response is out; an unframed one is closed, as before.
+        
+            No socket ever blocks: each one only gets a recv()/send() when
+            the kernel says it is ready. A thread costs an OS stack and a
+            context switch; a waiting client here costs one _Connection.
+            select() blocks with no timeout; stop() wakes it through the
+            _wakeup_r socket.
+        """
+        sel = selectors.DefaultSelector()
+        server_socket.setblocking(False)
+        sel.register(server_socket, selectors.EVENT_READ, data=None)
+        sel.register(self._wakeup_r, selectors.EVENT_READ, data=False)
+        try:
+            while self.running:
+                for key, events in sel.select():
+                    if key.data is False:
+                        break            # stop(): loop re-checks running
+                    if key.data is None:
+                        self._reactor_accept(sel, key.fileobj)
+                    elif events & selectors.EVENT_READ:
+                        self._reactor_read(sel, key.fileobj, key.data)
+                    elif self._reactor_send(sel, key.fileobj, key.data):
+                        # Sent; answer any request that queued up meanwhile
+                        self._reactor_dispatch(sel, key.fileobj, key.data)
+        finally:
+            for key in list(sel.get_map().values()):
+                if key.data:             # Client connections only
+                    key.fileobj.close()
+            sel.close()
+    
+    def _reactor_accept(self, sel, server_socket):
+        """Accept every connection waiting in the backlog."""
+        while True:
+            try:
+                conn, _ = server_socket.accept()
+            except BlockingIOError:
+                return
+            conn.setblocking(False)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sel.register(conn, selectors.EVENT_READ, data=_Connection())
+    
+    def _reactor_read(self, sel, conn, state):
+        """Read what has arrived; once the request is whole, answer it."""
+        try:
+            chunk = conn.recv(self.RECV_BUFFER_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b''
+        if not chunk:                    # Peer went away (or half-closed)
+            if state.inbuf and not state.framed:
+                # An unframed request that never parsed: it wasn't JSON
+                state.closing = True
+                state.outbuf = memoryview(BAD_JSON)
+                self._reactor_send(sel, conn, state)
+                return
+            sel.unregister(conn)
+            conn.close()
+            return
+        state.inbuf += chunk
+        self._reactor_dispatch(sel, conn, state)
+    
+    def _reactor_dispatch(self, sel, conn, state):
+        """Answer each complete request in inbuf, one response at a time."""
+        while state.outbuf is None and state.inbuf:
+            try:
+                request = self._parse_buffered(state)
+                if request is None:
+                    return               # Wait for the rest
+                response = self.process_request(request)
+                if type(response) is not bytes:
+                    response = b''.join(response)
+            except JSONDecodeError:
+                # A framed body was already consumed, the connection goes on
+                response = BAD_JSON_FRAME if state.framed else BAD_JSON
+                state.closing = not state.framed
+                state.outbuf = memoryview(response)
+                if not self._reactor_send(sel, conn, state):
+                    return
+                continue
+            except Exception as e:
+                print(f"[Stateful] Error: {e}")
+                response = json_dumps({'error': str(e)})
+                state.closing = True
+            
+            if state.framed:
+                response = FRAME_HEADER.pack(len(response)) + response
+            else:
+                state.closing = True     # Unframed: one request only
+            state.outbuf = memoryview(response)
+            if not self._reactor_send(sel, conn, state):
+                return                   # Closed, or waiting to be writable
+    
+    def _parse_buffered(self, state):
+        """Return the request in state.inbuf if it is complete, else None."""
+        buf = state.inbuf
+        if not state.framed and buf[0] != 0:
+            # Unframed JSON has no length: it is complete once it parses.
+            # Only a "{" (after any whitespace) is worth waiting on; junk
+            # is refused now, as one recv() + json.loads() always did
+            text = buf.lstrip()
+            if not text:
+                return None
+            try:
+                return json_loads(buf)
+            except ValueError:
+                if text[0] != 0x7b or len(buf) > MAX_FRAME_SIZE:
+                    raise
+                return None
+        
+        state.framed = True
+        if len(buf) < FRAME_HEADER.size:
+            return None
+        (length,) = FRAME_HEADER.unpack_from(buf)
+        if length > MAX_FRAME_SIZE:
+            raise ValueError(f'Frame too large: {length} bytes')
+        end = FRAME_HEADER.size + length
+        if len(buf) < end:
+            return None
+        try:
+            with memoryview(buf) as view:
+                return json_loads(view[FRAME_HEADER.size:end])
+        finally:
+            del buf[:end]                # Keep any pipelined bytes after it
+    
+    def _reactor_send(self, sel, conn, state):
+        """
+        Send as much of outbuf as the socket takes.
+        
+        Returns True once it is all sent and the connection stays open for
+        another request; False while waiting to be writable or once closed.
+        """
+        try:
+            sent = conn.send(state.outbuf)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            sent = len(state.outbuf)     # Peer is gone: nothing left to do
+            state.closing = True
+        state.outbuf = state.outbuf[sent:]
+        
+        if state.outbuf:
+            # Socket buffer full: finish when the kernel says it's writable
+            if not state.writing:
+                sel.modify(conn, selectors.EVENT_WRITE, data=state)
+                state.writing = True
+            return False
+        
+        state.outbuf = None
+        if state.closing:
+            sel.unregister(conn)
+            conn.close()                 # Session stays, as in handle_client
+            return False
+        if state.writing:
+            sel.modify(conn, selectors.EVENT_READ, data=state)
+            state.writing = False
+        return True
+    
+    def _fork_workers(self):
+        """
+        Fork workers-1 child processes; each returns here as its own worker.
+        
+        Scaling out a stateful server:
+        ───────────────────────────────
+        
+            One Python process runs Python code on one core at a time (the
+            GIL). N processes can use N cores - but each has its OWN
+            session store, so a session lives in exactly one of them:
+        
+                          ┌──► worker 0   sessions "00xxxxxxxx"
+                kernel ───┼──► worker 1   sessions "01xxxxxxxx"
+             (SO_REUSEPORT)└──► worker 2   sessions "02xxxxxxxx"
+        
+            The worker index is the first two hex chars of every session_id
+            it hands out. The kernel spreads NEW connections across the
+            workers; an upstream load balancer with session affinity must
+            route each later request by that prefix. A worker that receives
+            someone else's session answers with an error naming itself
+            instead of silently starting a fresh session.
+        """
+        if not hasattr(os, 'fork') or not hasattr(socket, 'SO_REUSEPORT'):
+            print("[Stateful Server] fork/SO_REUSEPORT unavailable, "
+                  "running a single worker")
+            self.workers = 1
+            return
+        
+        for worker_id in range(1, self.workers):
+            pid = os.fork()
+            if pid == 0:                 # Child: become worker_id
+                self.worker_id = worker_id
+                self._children = []
+                self._reseed_session_ids()  # Don't share the parent's key
+                break
+            self._children.append(pid)   # Parent: remember, keep forking
+        
+        self._sid_prefix = f'{self.worker_id:02x}'
+        self._wrong_worker = json_dumps({
+            'error': 'Session belongs to another worker',
+            'worker': self.worker_id
+        })
+    
+    def _listen(self):
+        """
+        Create, bind and return the listening socket.
+        
+        The backlog is how many finished TCP handshakes the kernel queues
+        for us while we're busy; past it, new clients are refused or
+        reset. The old fixed 5 was easy to overflow with a burst, so the
+        default is the system maximum (socket.SOMAXCONN).
+        
+        Options every client connection should have are set here, once:
+        accepted sockets inherit them from the listening socket, so no
+        setsockopt() calls are needed per connection.
+        
+            SO_KEEPALIVE   probe silent peers, so a client that vanished
+                           doesn't hold its connection (and thread) forever
+            SO_RCVBUF/     SOCKET_BUFFER_SIZE instead of the small default,
+            SO_SNDBUF      so a long history reply isn't stalled waiting
+                           for the buffer to drain. The receive buffer must
+                           be set before the handshake for the TCP window
+                           to use it, which only the listener allows.
+        
+        TCP_NODELAY is still set on each accepted socket: inheriting it is
+        Linux behaviour, not something every platform guarantees.
+        """
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF,
+                                 self.SOCKET_BUFFER_SIZE)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF,
+                                 self.SOCKET_BUFFER_SIZE)
+        if (self.workers > 1 or self.num_acceptors > 1) \
+                and hasattr(socket, 'SO_REUSEPORT'):
+            # Every worker/acceptor binds its own socket to the same port
+            # and the kernel load-balances incoming connections between them
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        server_socket.bind((self.host, self.port))
+        server_socket.listen(self.listen_backlog or socket.SOMAXCONN)
+        return server_socket
     
     def start(self):
         """
@@ -613,8 +1795,8 @@ class StatefulCalculatorServer:
             │          ▲              ▲              ▲                    │
             │          │              │              │                    │
             │   ┌──────┴──────┐ ┌────┴─────┐ ┌─────┴─────┐              │
-            │   │  Handler 1  │ │ Handler 2│ │ Handler 3 │              │
-            │   │  (thread)   │ │ (thread) │ │ (thread)  │              │
+            │   │  Handler 1  │ │ Handler 2│ │ Handler 3 │  ◄ thread    │
+            │   │  (pool)     │ │ (pool)   │ │ (pool)    │    pool      │
             │   └─────────────┘ └──────────┘ └───────────┘              │
             │          ▲              ▲              ▲                    │
             │          │              │              │                    │
@@ -624,33 +1806,116 @@ class StatefulCalculatorServer:
             │   └────────────────────────────────────────────┘            │
             │                                                             │
             └─────────────────────────────────────────────────────────────┘
+        
+        With mode="asyncio" the handlers are coroutines on a single
+        event loop (uvloop if installed) instead of threads; mode="reactor"
+        drives every socket from one selectors loop (see _serve_reactor). With
+        workers > 1 the whole server is forked into that many processes
+        sharing the port (see _fork_workers).
         """
         self.running = True
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server_socket.bind((self.host, self.port))
-        server_socket.listen(5)
-        server_socket.settimeout(1)
         
-        print(f"[Stateful Server] Running on {self.host}:{self.port}")
+        # Fork BEFORE starting any thread: a forked child only keeps the
+        # thread that called fork()
+        if self.workers > 1:
+            self._fork_workers()
+        
+        server_socket = self._listen()
+        
+        worker = f" [worker {self.worker_id}]" if self.workers > 1 else ""
+        print(f"[Stateful Server] Running on {self.host}:{self.port}{worker}")
         print("[Stateful Server] I remember EVERYTHING about each session!")
         
-        while self.running:
-            try:
-                client_socket, address = server_socket.accept()
-                thread = threading.Thread(
-                    target=self.handle_client,
-                    args=(client_socket, address)
-                )
-                thread.start()
-            except socket.timeout:
-                continue
+        # Janitor: evicts idle sessions in the background (a thread here;
+        # asyncio mode runs it as a task on the loop instead)
+        if self.mode != 'asyncio':
+            self._janitor_wakeup.clear()
+            janitor = threading.Thread(target=self._janitor, daemon=True)
+            janitor.start()
         
-        server_socket.close()
+        try:
+            if self.mode == 'asyncio':
+                print(f"[Stateful Server] asyncio mode"
+                      f"{' (uvloop)' if uvloop else ''}")
+                self._async_stop = asyncio.Event()
+                self._loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+                try:
+                    self._loop.run_until_complete(self.serve(server_socket))
+                finally:
+                    self._loop.close()
+                    self._loop = None
+            else:
+                # stop() wakes the blocked select() calls through this pair
+                self._wakeup_r, self._wakeup_w = socket.socketpair()
+                if self.mode == 'reactor':
+                    print("[Stateful Server] reactor mode "
+                          f"({selectors.DefaultSelector.__name__})")
+                    self._serve_reactor(server_socket)
+                else:
+                    self._serve_threads(server_socket)
+        finally:
+            server_socket.close()
+            if self._wakeup_r is not None:
+                self._wakeup_r.close()
+                self._wakeup_w.close()
+                self._wakeup_r = self._wakeup_w = None
+            if self.worker_id:
+                # Forked child: never return into the parent's code
+                os._exit(0)
     
-    def stop(self):
-        """Stop the server."""
+    def stop(self, timeout=5):
+        """
+        Stop the server (and any forked worker processes).
+        
+        Graceful drain (threads mode):
+        ──────────────────────────────
+        
+            The accept loops stop taking new clients right away. Handlers
+            already running get up to `timeout` seconds (None = no limit)
+            to finish; whatever is still open after that is cut off:
+        
+                stop() ──► wait until _inflight == 0 ──► return
+                                  │
+                                  └── deadline passed ──► shutdown() every
+                                      live socket, cancel queued handlers
+        
+            An idle keep-alive client counts as in flight until it sends
+            its next request (answered, then closed) or the deadline hits.
+        """
         self.running = False
+        self._janitor_wakeup.set()
+        
+        for pid in self._children:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        self._children = []
+        
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._async_stop.set)
+        
+        wakeup = self._wakeup_w
+        if wakeup is not None:
+            try:
+                wakeup.send(b'x')        # Never read: stays readable for all
+            except OSError:
+                pass                     # Already closed by start()
+        
+        with self._inflight_cv:
+            if self._inflight_cv.wait_for(lambda: not self._inflight, timeout):
+                return
+            stragglers = list(self._live_sockets)
+        
+        print(f"[Stateful Server] Closing {len(stragglers)} connection(s) "
+              "still open after the drain deadline")
+        for sock in stragglers:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)  # Wakes its blocked recv()
+            except OSError:
+                pass                     # Closed meanwhile
+        pool = self.pool
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
 
 
 # =============================================================================
@@ -700,25 +1965,31 @@ def demonstrate_stateful():
     time.sleep(0.5)
     
     session_id = None
+    recv_buf = bytearray(65536)  # Reused for every response
     
-    def send_request(operation, **kwargs):
+    def send_request(sock, operation, **kwargs):
         """Helper to send request maintaining session."""
         nonlocal session_id
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect(('localhost', 8002))
-        
         request = {'operation': operation, 'session_id': session_id, **kwargs}
-        sock.send(json.dumps(request).encode())
+        send_frame(sock, json_dumps(request))     # [length][JSON]
         
-        response = json.loads(sock.recv(1024).decode())
-        sock.close()
+        body = recv_frame(sock, recv_buf)
+        if body is None:
+            raise ConnectionError('Server closed the connection')
+        response = json_loads(body)
         
         if 'session_id' in response:
             session_id = response['session_id']
         
         return response
     
+    # ONE connection for the whole demo: framing lets it carry every
+    # request, so we pay for a single TCP handshake instead of one each
+    sock = None
     try:
+        sock = socket.create_connection(('localhost', 8002))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        
         print("""
     ┌────────────────────────────────────────────────────────────┐
     │  Calculating: ((10 + 5) × 2) - 3 = 27                     │
@@ -732,7 +2003,7 @@ def demonstrate_stateful():
         # Step 1: Start session
         # ─────────────────────────────────────────────────────────────────
         print("  Step 1: Starting session...")
-        resp = send_request('start_session')
+        resp = send_request(sock, 'start_session')
         print(f"    Server: 'Your session ID is {resp['session_id']}'")
         print(f"    Server: 'I will remember everything for you!'")
         
@@ -740,7 +2011,7 @@ def demonstrate_stateful():
         # Step 2: Calculate 10 + 5 = 15
         # ─────────────────────────────────────────────────────────────────
         print("\n  Step 2: Calculate 10 + 5")
-        resp = send_request('calculate', a=10, b=5, op='add')
+        resp = send_request(sock, 'calculate', a=10, b=5, op='add')
         print(f"    Client: 'Please calculate 10 + 5'")
         print(f"    Server: 'Result is {resp['result']}'")
         print(f"    Server: *stores last_result = {resp['result']}*")
@@ -751,7 +2022,7 @@ def demonstrate_stateful():
         print("\n  Step 3: Use LAST RESULT × 2")
         print("    Client: 'Multiply your last result by 2'")
         print("            (Notice: Client only sends '2', not '15'!)")
-        resp = send_request('use_last', b=2, op='multiply')
+        resp = send_request(sock, 'use_last', b=2, op='multiply')
         print(f"    Server: 'You want last_result(15) × 2 = {resp['result']}'")
         print(f"    Server: *stores last_result = {resp['result']}*")
         
@@ -761,14 +2032,14 @@ def demonstrate_stateful():
         print("\n  Step 4: Use LAST RESULT - 3")
         print("    Client: 'Subtract 3 from your last result'")
         print("            (Notice: Client only sends '3', not '30'!)")
-        resp = send_request('use_last', b=3, op='subtract')
+        resp = send_request(sock, 'use_last', b=3, op='subtract')
         print(f"    Server: 'You want last_result(30) - 3 = {resp['result']}'")
         
         # ─────────────────────────────────────────────────────────────────
         # Bonus: View history (ONLY STATEFUL CAN DO THIS!)
         # ─────────────────────────────────────────────────────────────────
         print("\n  Step 5: View HISTORY (stateless can't do this!)")
-        resp = send_request('history')
+        resp = send_request(sock, 'history')
         print(f"    Server: 'Here's everything we've done:'")
         for i, h in enumerate(resp['history']):
             print(f"      {i+1}. {h['operation']} = {h['result']}")
@@ -777,7 +2048,7 @@ def demonstrate_stateful():
         # Bonus: Undo last operation (ONLY STATEFUL CAN DO THIS!)
         # ─────────────────────────────────────────────────────────────────
         print("\n  Step 6: UNDO last operation (stateless can't do this!)")
-        resp = send_request('undo')
+        resp = send_request(sock, 'undo')
         print(f"    Server: 'I removed: {resp['undone']}'")
         print(f"    Server: 'Your last result is now: {resp['last_result']}'")
         
@@ -785,7 +2056,7 @@ def demonstrate_stateful():
         # View history after undo
         # ─────────────────────────────────────────────────────────────────
         print("\n  Step 7: View history after undo")
-        resp = send_request('history')
+        resp = send_request(sock, 'history')
         for i, h in enumerate(resp['history']):
             print(f"      {i+1}. {h['operation']} = {h['result']}")
         
@@ -806,6 +2077,8 @@ def demonstrate_stateful():
         """)
         
     finally:
+        if sock is not None:
+            sock.close()
         server.stop()
         server_thread.join()
 
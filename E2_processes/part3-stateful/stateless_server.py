@@ -125,7 +125,188 @@ SCALING ADVANTAGE OF STATELESS
 
 import socket
 import json
+import logging
+import operator
 import threading
+from concurrent.futures import ThreadPoolExecutor
+import os
+import platform
+import re
+import selectors
+import signal
+import struct
+
+# Every frame is JSON both ways, so the codec is on the hot path of each
+# request. orjson parses and emits bytes natively (no .decode()/.encode()
+# round trip); plain json keeps the demo runnable when it isn't installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+    def json_loads(data):
+        # Frames arrive as memoryview slices of the recv buffer, which
+        # json.loads rejects (orjson takes them as-is)
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+else:
+    # orjson reads an int past 64 bits as a float, without error:
+    #   {"a": 100000000000000000001} -> {'a': 1e+20}
+    # which would break encode_result's exact-int answers. Any 19-digit run
+    # might be such an int, so those (rare) frames are parsed by json.
+    _LONG_DIGITS = re.compile(rb'[0-9]{19}')
+
+    def json_loads(data):
+        if _LONG_DIGITS.search(data) is None:
+            return orjson.loads(data)
+        return json.loads(bytes(data))
+
+    def json_dumps(obj):
+        try:
+            return orjson.dumps(obj)
+        except TypeError:            # The same limit on the way out
+            return json.dumps(obj).encode()
+
+# Per-request lines go to this logger at DEBUG, so by default (WARNING) they
+# cost one level check instead of an f-string and a locked write to stdout.
+# The demo in __main__ turns them on.
+logger = logging.getLogger('stateless')
+
+
+def _divide(a, b):
+    """a / b, or None when dividing by zero."""
+    return a / b if b != 0 else None
+
+
+# Operation name -> function: one dict lookup to a C built-in instead of an
+# if/elif ladder of string compares (same idea as calc_ops.ARITH_OPS).
+#
+# Why not generate "lambda a, b: a + b" per operation (exec/eval) so the
+# add is a single bytecode? Calling a lambda still builds a Python frame;
+# operator.add is a C function and skips that. On CPython 3.11 the dict
+# lookup + call measured ~1.8x faster with the operator built-ins.
+ARITH_OPS = {
+    'add': operator.add,
+    'multiply': operator.mul,
+    'subtract': operator.sub,
+    'divide': _divide,
+}
+
+# Every response has the same shape, so everything but the result is
+# serialized once, up front:
+#
+#     {"result":  15  ,"server_type":"stateless"}
+#     └── HEAD ──┘└┬─┘└──────── TAIL ──────────┘
+#                  └── the only bytes built per request
+RESPONSE_HEAD = b'{"result":'
+RESPONSE_TAIL = b',"server_type":"stateless"}'
+NULL_RESPONSE = RESPONSE_HEAD + b'null' + RESPONSE_TAIL  # Unknown op, x / 0
+BATCH_HEAD = b'{"results":['
+BATCH_TAIL = b']' + RESPONSE_TAIL
+
+
+def encode_result(result):
+    """JSON bytes for one result (ints directly, so no 64-bit limit)."""
+    if type(result) is int:
+        return b'%d' % result
+    if result is None:
+        return b'null'
+    return json_dumps(result)            # float
+
+# Reactor mode: a request that is still not valid JSON after this many
+# bytes never will be, so the connection is dropped. Also the largest frame.
+MAX_REQUEST_SIZE = 1 << 16
+
+# ═══════════════════════════════════════════════════════════════════════════
+# FRAMING: a 4-byte big-endian length, then that many bytes of JSON
+# ═══════════════════════════════════════════════════════════════════════════
+#
+#   ┌──────────────┬──────────────────────────────────────────┐
+#   │ 00 00 00 28  │ {"operation":"add","a":10,"b":5}...      │
+#   │ length = 40  │ 40 bytes of JSON                         │
+#   └──────────────┴──────────────────────────────────────────┘
+#
+# A single recv() may return part of a request (or, for a big one, stop at
+# the buffer size); with the length up front the server knows exactly how
+# much to wait for. No frame is over MAX_REQUEST_SIZE, so a header always
+# starts with a 00 byte, which plain JSON never does: any other first byte
+# (a "{", "[" for a batch, or whitespace before either) is an unframed
+# client, and unframed clients still work.
+FRAME_HEADER = struct.Struct('!I')
+JSON_FIRST_BYTES = frozenset(b'{[')   # What unframed JSON may start with
+
+
+def send_frame(sock, payload):
+    """Send one length-prefixed message (payload is bytes)."""
+    sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(sock, buf):
+    """
+    Receive one length-prefixed message into buf; None if the peer closed
+    first. Returns a memoryview of the body inside buf.
+    """
+    view = memoryview(buf)
+    if not _recv_exactly(sock, view[:FRAME_HEADER.size]):
+        return None
+    (length,) = FRAME_HEADER.unpack_from(buf)
+    if length > MAX_REQUEST_SIZE:
+        raise ValueError(f'Frame too large: {length} bytes')
+    if length > len(buf):
+        view = memoryview(bytearray(length))
+    body = view[:length]
+    if not _recv_exactly(sock, body):
+        return None
+    return body
+
+
+def _recv_exactly(sock, view):
+    """Fill view completely from sock; False if the peer closed first."""
+    while view:
+        n = sock.recv_into(view)
+        if n == 0:
+            return False
+        view = view[n:]
+    return True
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# BINARY REQUESTS: an opcode byte and two float64s, no JSON at all
+# ═══════════════════════════════════════════════════════════════════════════
+#
+#   request  ┌────┬─────────────────────────┬─────────────────────────┐
+#   17 bytes │ op │ a (float64, big-endian) │ b (float64, big-endian) │
+#            └────┴─────────────────────────┴─────────────────────────┘
+#   response ┌─────────────────────────┐
+#   8 bytes  │ result (float64)        │   NaN where JSON would say null
+#            └─────────────────────────┘
+#
+# One struct.unpack_from() replaces a JSON parse, one struct.pack() the
+# encode. Opcodes 1-4 can't start a frame (that would be a length of
+# 16 MiB or more) or JSON, so the first byte selects the format. Both
+# operands arrive as doubles, so results are always floats. A connection
+# can send any number of these back to back.
+NAN = float('nan')
+BINARY_REQUEST = struct.Struct('!Bdd')
+BINARY_RESPONSE = struct.Struct('!d')
+OPCODES = {'add': 1, 'multiply': 2, 'subtract': 3, 'divide': 4}
+BINARY_OPS = {code: ARITH_OPS[name] for name, code in OPCODES.items()}
+
+
+class _Connection:
+    """Reactor mode: what one client socket has sent and has yet to receive."""
+    
+    __slots__ = ('address', 'inbuf', 'outbuf', 'framed', 'binary', 'writing')
+    
+    def __init__(self, address):
+        self.address = address    # Only for the log line
+        self.inbuf = bytearray()  # Request bytes read so far
+        self.framed = False       # Request started with a length prefix
+        self.binary = False       # Requests are BINARY_REQUEST structs
+        self.outbuf = None        # memoryview of response bytes still unsent
+        self.writing = False      # Registered for EVENT_WRITE
 
 
 class StatelessCalculatorServer:
@@ -156,9 +337,15 @@ class StatelessCalculatorServer:
     
     Instance variables (server config only, NOT client state):
     ──────────────────────────────────────────────────────────
-    • host     : str   - Address to bind to
-    • port     : int   - Port to listen on
-    • running  : bool  - Server running flag
+    • host        : str   - Address to bind to
+    • port        : int   - Port to listen on
+    • running     : bool  - Server running flag
+    • ready       : Event - Set once the port is listening
+    • mode        : str   - "threads" (pool) or "reactor" (one selectors loop)
+    • workers     : int   - Processes sharing the port (see _fork_workers)
+    • worker_id   : int   - 0 = parent, 1.. = forked worker
+    • max_workers : int   - Size of the handler thread pool
+    • pool        : ThreadPoolExecutor - Handler threads (while running)
     
     What we DON'T have (stateless!):
     ────────────────────────────────
@@ -168,7 +355,10 @@ class StatelessCalculatorServer:
     • client_data    ✗  (no client-specific storage)
     """
     
-    def __init__(self, host='localhost', port=8001):
+    RECV_BUFFER_SIZE = 4096   # Largest request we accept in one read
+    IDLE_TIMEOUT = 30         # Seconds a framed connection may sit idle
+    
+    def __init__(self, host='localhost', port=8001, mode='threads', workers=1):
         """
         Initialize stateless server.
         
@@ -180,10 +370,29 @@ class StatelessCalculatorServer:
             Network interface to bind to
         port : int, default=8001
             TCP port to listen on
+        mode : str, default='threads'
+            "threads" hands each connection to a pooled thread; "reactor"
+            serves every connection from one thread (see _serve_reactor)
+        workers : int, default=1
+            Number of processes serving the port (Linux, SO_REUSEPORT)
         """
         self.host = host
         self.port = port
+        self.mode = mode
+        self.workers = workers
+        self.worker_id = 0
+        self._children = []         # Parent only: pids of forked workers
         self.running = False
+        self.ready = threading.Event()  # Set by start() once listening
+        
+        # A fixed pool of handler threads, created in start(). The threads
+        # are reused from one request to the next but keep nothing from
+        # them: every call to handle_client() starts from scratch.
+        self.max_workers = min(32, (os.cpu_count() or 1) * 4)
+        self.pool = None
+        self._wakeup_r = None       # Readable once stop() writes a byte
+        self._wakeup_w = None       #   to _wakeup_w
+        self._local = threading.local()  # Per-thread receive buffer
         # NOTE: No self.sessions, self.history, etc.!
     
     def handle_client(self, client_socket, address):
@@ -208,8 +417,12 @@ class StatelessCalculatorServer:
         
         Important: After close(), we have ZERO memory of this request!
         
-        Expected request format:
-        ────────────────────────
+        Framed clients may send more requests on the same connection; each
+        one runs steps 1-4 again from scratch. Reusing the socket saves a
+        TCP handshake, not any state: nothing links one request to the next.
+        
+        Expected request format (optionally framed, see FRAME_HEADER):
+        ────────────────────────────────────────────────────────────────
             {
                 "operation": "add" | "multiply" | "subtract" | "divide",
                 "a": <number>,      ◄── Client MUST send both operands!
@@ -222,63 +435,62 @@ class StatelessCalculatorServer:
                 "result": <number>,
                 "server_type": "stateless"
             }
+        
+        A JSON array of requests gets {"results": [...], ...} instead
+        (see process_request).
         """
         try:
-            # ─────────────────────────────────────────────────────────────
-            # STEP 1: Receive raw bytes from socket
-            # ─────────────────────────────────────────────────────────────
-            data = client_socket.recv(1024).decode()
-            
-            # ─────────────────────────────────────────────────────────────
-            # STEP 2: Parse JSON request
-            # ─────────────────────────────────────────────────────────────
-            request = json.loads(data)
-            
-            # ─────────────────────────────────────────────────────────────
-            # STEP 3: Extract operation and operands
-            # ─────────────────────────────────────────────────────────────
-            # NOTE: Client MUST send ALL data - we don't remember anything!
-            #
-            #   Stateless requirement:
-            #   ┌────────────────────────────────────────────────────────┐
-            #   │  Client sends:  { "op": "multiply", "a": 15, "b": 2 } │
-            #   │                                       ▲               │
-            #   │                                       │               │
-            #   │  Even if "15" was our last result,   │               │
-            #   │  client must send it again! ─────────┘               │
-            #   └────────────────────────────────────────────────────────┘
-            #
-            operation = request.get('operation')
-            a = request.get('a')
-            b = request.get('b')
+            # One small response: send it now instead of letting Nagle hold it
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client_socket.settimeout(self.IDLE_TIMEOUT)
             
-            print(f"[Stateless] Request from {address}: {a} {operation} {b}")
+            # recv_into() fills this thread's reusable buffer in place: no
+            # new bytes object per request, and no .decode() copy either.
+            # Peek at the first byte to tell a framed request from plain
+            # JSON: a framed one is read to its exact length.
+            buf = self._recv_buffer()
+            n = client_socket.recv_into(buf, 1, socket.MSG_PEEK)
+            if n and buf[0] in BINARY_OPS:
+                self._handle_binary(client_socket, buf, address)
+                return
+            framed = n > 0 and buf[0] == 0   # 00: high byte of a length
             
-            # ─────────────────────────────────────────────────────────────
-            # STEP 4: Calculate result (NO STATE from previous requests)
-            # ─────────────────────────────────────────────────────────────
-            if operation == 'add':
-                result = a + b
-            elif operation == 'multiply':
-                result = a * b
-            elif operation == 'subtract':
-                result = a - b
-            elif operation == 'divide':
-                result = a / b if b != 0 else None
-            else:
-                result = None
-            
-            # ─────────────────────────────────────────────────────────────
-            # STEP 5: Send response
-            # ─────────────────────────────────────────────────────────────
-            response = {
-                'result': result,
-                'server_type': 'stateless'  # Identifying ourselves
-            }
-            client_socket.send(json.dumps(response).encode())
+            while True:
+                # ─────────────────────────────────────────────────────────
+                # STEP 1: Receive raw bytes from socket
+                # ─────────────────────────────────────────────────────────
+                if framed:
+                    data = recv_frame(client_socket, buf)
+                    if data is None:
+                        break                # Client is done with us
+                else:
+                    n = client_socket.recv_into(buf)
+                    data = memoryview(buf)[:n]
+                
+                # ─────────────────────────────────────────────────────────
+                # STEP 2: Parse JSON request
+                # ─────────────────────────────────────────────────────────
+                request = json_loads(data)
+                
+                # ─────────────────────────────────────────────────────────
+                # STEP 3-4: Calculate (see process_request)
+                # ─────────────────────────────────────────────────────────
+                response = self.process_request(request, address)
+                
+                # ─────────────────────────────────────────────────────────
+                # STEP 5: Send response
+                # ─────────────────────────────────────────────────────────
+                if not framed:
+                    client_socket.sendall(response)  # send() may be partial
+                    break                    # Unframed: one request only
+                send_frame(client_socket, response)  # [length][JSON]
+                if not self.running:
+                    break                    # stop(): finish, don't wait
             
+        except socket.timeout:
+            pass                             # Idle keep-alive client
         except Exception as e:
-            print(f"[Stateless] Error: {e}")
+            logger.error("[Stateless] Error: %s", e)
         finally:
             # ─────────────────────────────────────────────────────────────
             # STEP 6: Close connection and FORGET EVERYTHING
@@ -301,6 +513,98 @@ class StatelessCalculatorServer:
             #
             client_socket.close()
     
+    def _handle_binary(self, client_socket, buf, address):
+        """Answer BINARY_REQUESTs on client_socket until it closes."""
+        request = memoryview(buf)[:BINARY_REQUEST.size]
+        while _recv_exactly(client_socket, request):
+            client_socket.sendall(self.process_binary(buf, address))
+            if not self.running:
+                break                    # stop(): finish, don't wait
+    
+    def process_binary(self, data, address):
+        """The BINARY_RESPONSE bytes for the BINARY_REQUEST at data[0:17]."""
+        op, a, b = BINARY_REQUEST.unpack_from(data)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[Stateless] Binary request from %s: %s %s %s",
+                         address, a, op, b)
+        fn = BINARY_OPS.get(op)
+        if fn is None:
+            raise ValueError(f'Unknown opcode: {op}')  # Connection is closed
+        result = fn(a, b)
+        return BINARY_RESPONSE.pack(NAN if result is None else result)
+    
+    def _recv_buffer(self):
+        """Return this thread's receive buffer, creating it on first use."""
+        try:
+            return self._local.buf
+        except AttributeError:
+            buf = self._local.buf = bytearray(self.RECV_BUFFER_SIZE)
+            return buf
+    
+    def process_request(self, request, address):
+        """
+        Calculate the response to one parsed request.
+        
+        Shared by handle_client (threads) and the reactor loop. Everything
+        it needs arrives in `request`; nothing survives the call.
+        
+        Batches:
+        ────────
+        
+            A JSON array of requests is answered in one response, in order:
+        
+                [{"operation": "add", "a": 1, "b": 2},     {"results": [3, 8],
+                 {"operation": "multiply", "a": 2, "b": 4}]  "server_type": ...}
+        
+            One connection and one parse for N independent calculations.
+            Still stateless: no entry can refer to another's result.
+        
+        Returns:
+        ────────
+        bytes : the encoded JSON response
+        """
+        if type(request) is list:
+            results = [self.calculate(entry, address) for entry in request]
+            return (BATCH_HEAD + b','.join(map(encode_result, results))
+                    + BATCH_TAIL)
+        
+        # Response: {"result": ..., "server_type": "stateless"} - only the
+        # result is encoded here, and a null result not even that
+        result = self.calculate(request, address)
+        if result is None:
+            return NULL_RESPONSE
+        return RESPONSE_HEAD + encode_result(result) + RESPONSE_TAIL
+    
+    def calculate(self, request, address):
+        """Return the result of one {"operation", "a", "b"} request."""
+        # ─────────────────────────────────────────────────────────────────
+        # STEP 3: Extract operation and operands
+        # ─────────────────────────────────────────────────────────────────
+        # NOTE: Client MUST send ALL data - we don't remember anything!
+        #
+        #   Stateless requirement:
+        #   ┌────────────────────────────────────────────────────────┐
+        #   │  Client sends:  { "op": "multiply", "a": 15, "b": 2 } │
+        #   │                                       ▲               │
+        #   │                                       │               │
+        #   │  Even if "15" was our last result,   │               │
+        #   │  client must send it again! ─────────┘               │
+        #   └────────────────────────────────────────────────────────┘
+        #
+        operation = request.get('operation')
+        a = request.get('a')
+        b = request.get('b')
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[Stateless] Request from %s: %s %s %s",
+                         address, a, operation, b)
+        
+        # ─────────────────────────────────────────────────────────────────
+        # STEP 4: Calculate result (NO STATE from previous requests)
+        # ─────────────────────────────────────────────────────────────────
+        fn = ARITH_OPS.get(operation)
+        return fn(a, b) if fn is not None else None  # Unknown op: None
+    
     def start(self):
         """
         Start the stateless server.
@@ -323,8 +627,8 @@ class StatelessCalculatorServer:
             │         │                                           │       │
             │         ▼                                           │       │
             │    ┌──────────┐     ┌──────────────────────┐       │       │
-            │    │  SPAWN   │────►│  Handler Thread      │       │       │
-            │    │  THREAD  │     │  • recv()            │       │       │
+            │    │  SUBMIT  │────►│  Pooled Thread       │       │       │
+            │    │  TO POOL │     │  • recv()            │       │       │
             │    └────┬─────┘     │  • process()         │       │       │
             │         │           │  • send()            │       │       │
             │         │           │  • close()           │       │       │
@@ -334,39 +638,334 @@ class StatelessCalculatorServer:
             │         └───────────────────────────────────────────┘       │
             │                                                             │
             └─────────────────────────────────────────────────────────────┘
+        
+        Thread pool:
+        ────────────
+        
+            Starting a thread per connection pays a thread create/destroy
+            on every request, and a burst of clients becomes a burst of
+            threads. The pool creates max_workers threads once; accepted
+            connections queue until one of them is free.
+        
+        Accepting vs processing:
+        ────────────────────────
+        
+            This thread only accepts and hands off; the pool does all the
+            work. The handoff is bounded: max_workers * 2 permits cap how
+            many connections may be running or queued at once.
+        
+                accept() ──acquire()──► pool.submit(handle_client)
+                   ▲                               │
+                   └──────── release() ◄── done ───┘
+        
+            With every permit taken the loop stops accepting, and new
+            clients wait in the kernel's listen backlog instead of an
+            ever-growing queue. While idle the thread sleeps in select()
+            - no accept() timeout waking it every second - until a client
+            connects or stop() writes to the _wakeup_r socket.
+        
+        With mode="reactor" there is no pool at all: one thread drives
+        every connection from a selectors loop (see _serve_reactor). With
+        workers > 1 the whole server is forked into that many processes
+        sharing the port (see _fork_workers).
         """
         self.running = True
         
+        # Fork BEFORE starting any thread: a forked child only keeps the
+        # thread that called fork()
+        if self.workers > 1:
+            self._fork_workers()
+        
         # Create server socket
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Connections can now outlive one request: probe silent peers so a
+        # vanished client doesn't hold its socket forever. Accepted sockets
+        # inherit this from the listener.
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if self.workers > 1:
+            # Every worker binds its own socket to the same port and the
+            # kernel load-balances incoming connections between them
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         server_socket.bind((self.host, self.port))
-        server_socket.listen(5)
-        server_socket.settimeout(1)  # Allow checking self.running
+        # Clients wait here while every permit is taken, so leave room
+        server_socket.listen(socket.SOMAXCONN)
+        server_socket.setblocking(False)  # accept() only after select()
+        # From here on connect() succeeds (clients queue in the backlog)
+        self.ready.set()
         
-        print(f"[Stateless Server] Running on {self.host}:{self.port}")
+        worker = f" [worker {self.worker_id}]" if self.workers > 1 else ""
+        print(f"[Stateless Server] Running on {self.host}:{self.port}{worker}")
         print("[Stateless Server] I remember NOTHING between requests!")
         
-        while self.running:
-            try:
-                client_socket, address = server_socket.accept()
+        # stop() wakes the blocked select() through this pair
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        try:
+            if self.mode == 'reactor':
+                print("[Stateless Server] reactor mode "
+                      f"({selectors.DefaultSelector.__name__})")
+                self._serve_reactor(server_socket)
+            else:
+                self._serve_threads(server_socket)
+        finally:
+            self.ready.clear()
+            server_socket.close()
+            self._wakeup_r.close()
+            self._wakeup_w.close()
+            self._wakeup_r = self._wakeup_w = None
+            if self.worker_id:
+                # Forked child: never return into the parent's code
+                os._exit(0)
+    
+    def _fork_workers(self):
+        """
+        Fork workers-1 child processes; each returns here as its own worker.
+        
+        Scaling out a stateless server:
+        ───────────────────────────────
+        
+            One Python process runs Python code on one core at a time (the
+            GIL). N processes use N cores, and because this server keeps no
+            state, nothing has to be shared or routed between them:
+        
+                          ┌──► worker 0  ┐
+                kernel ───┼──► worker 1  ├── any worker can answer any
+             (SO_REUSEPORT)└──► worker 2  ┘   request - no affinity needed
+        
+            Compare the stateful server's workers, where every session is
+            pinned to the one process that holds it.
+        """
+        if not hasattr(os, 'fork') or not hasattr(socket, 'SO_REUSEPORT'):
+            print("[Stateless Server] fork/SO_REUSEPORT unavailable, "
+                  "running a single worker")
+            self.workers = 1
+            return
+        
+        for worker_id in range(1, self.workers):
+            pid = os.fork()
+            if pid == 0:                 # Child: become worker_id
+                self.worker_id = worker_id
+                self._children = []
+                return
+            self._children.append(pid)   # Parent: remember, keep forking
+    
+    def _serve_threads(self, server_socket):
+        """Accept connections and hand each one to a pooled thread."""
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                       thread_name_prefix='stateless')
+        permits = threading.BoundedSemaphore(self.max_workers * 2)
+        release = lambda future: permits.release()
+        
+        sel = selectors.DefaultSelector()
+        sel.register(server_socket, selectors.EVENT_READ)
+        sel.register(self._wakeup_r, selectors.EVENT_READ)
+        try:
+            while self.running:
+                if not permits.acquire(timeout=1):
+                    continue             # All busy: re-check self.running
+                sel.select()
+                try:
+                    client_socket, address = server_socket.accept()
+                except BlockingIOError:  # Woken by stop(), not a client
+                    permits.release()
+                    continue
+                client_socket.setblocking(True)
                 
-                # Handle each client in a separate thread
+                # Handle each client on a pooled thread
                 # (but still stateless - thread has no persistent memory)
-                thread = threading.Thread(
-                    target=self.handle_client,
-                    args=(client_socket, address)
-                )
-                thread.start()
-                
-            except socket.timeout:
-                continue  # Check if still running
+                future = self.pool.submit(self.handle_client,
+                                          client_socket, address)
+                future.add_done_callback(release)
+        finally:
+            sel.close()
+            self.pool.shutdown(wait=True)  # Let in-flight requests finish
+            self.pool = None
+    
+    def _serve_reactor(self, server_socket):
+        """
+        Serve every connection from one thread with a selectors loop.
+        
+        Why no threads?
+        ───────────────
+        
+            A stateless request is tiny - recv, parse, add two numbers,
+            send, close - so a handler thread spends nearly all its life
+            waiting on the socket. Here that waiting is left to the kernel:
+        
+            ┌──────────────────────────────────────────────────────────────┐
+            │  sel.select()  ◄── epoll (Linux) / kqueue (BSD, macOS)      │
+            │      │                                                       │
+            │      ├── listening socket readable ──► accept, register     │
+            │      ├── client readable  ──► recv, append to inbuf,        │
+            │      │                        complete? process + send      │
+            │      └── client writable  ──► send rest of outbuf           │
+            └──────────────────────────────────────────────────────────────┘
         
-        server_socket.close()
+            Once its response is out, an unframed connection is closed; a
+            framed one goes back to waiting for its next request (requests
+            that were pipelined behind it are answered first, in order).
+        
+            No socket ever blocks. A waiting client costs one _Connection
+            (this statelessness holds: it is dropped with the socket) and
+            a couple of epoll events instead of a thread of its own.
+        """
+        sel = selectors.DefaultSelector()
+        sel.register(server_socket, selectors.EVENT_READ, data=None)
+        sel.register(self._wakeup_r, selectors.EVENT_READ, data=False)
+        try:
+            while self.running:
+                for key, events in sel.select():
+                    if key.data is False:
+                        break            # stop(): loop re-checks running
+                    if key.data is None:
+                        self._reactor_accept(sel, key.fileobj)
+                    elif events & selectors.EVENT_READ:
+                        self._reactor_read(sel, key.fileobj, key.data)
+                    elif self._reactor_send(sel, key.fileobj, key.data):
+                        # Sent; answer any request that queued up meanwhile
+                        self._reactor_dispatch(sel, key.fileobj, key.data)
+        finally:
+            for key in list(sel.get_map().values()):
+                if key.data:             # Client connections only
+                    key.fileobj.close()
+            sel.close()
+    
+    def _reactor_accept(self, sel, server_socket):
+        """Accept every connection waiting in the backlog."""
+        while True:
+            try:
+                conn, address = server_socket.accept()
+            except BlockingIOError:
+                return
+            conn.setblocking(False)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sel.register(conn, selectors.EVENT_READ, data=_Connection(address))
+    
+    def _reactor_read(self, sel, conn, state):
+        """Read what has arrived; once it parses as JSON, answer it."""
+        try:
+            chunk = conn.recv(self.RECV_BUFFER_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b''
+        if not chunk or len(state.inbuf) + len(chunk) > MAX_REQUEST_SIZE:
+            # Gone (or garbage) before a whole request: close, like the
+            # threaded handler does when its request doesn't parse
+            sel.unregister(conn)
+            conn.close()
+            return
+        state.inbuf += chunk
+        self._reactor_dispatch(sel, conn, state)
+    
+    def _reactor_dispatch(self, sel, conn, state):
+        """Answer each complete request in inbuf, one response at a time."""
+        while state.outbuf is None and state.inbuf:
+            try:
+                if state.binary or not state.framed \
+                        and state.inbuf[0] in BINARY_OPS:
+                    state.binary = True
+                    if len(state.inbuf) < BINARY_REQUEST.size:
+                        return           # Wait for the rest
+                    response = self.process_binary(state.inbuf, state.address)
+                    del state.inbuf[:BINARY_REQUEST.size]
+                else:
+                    request = self._parse_buffered(state)
+                    if request is None:
+                        return           # Wait for the rest
+                    response = self.process_request(request, state.address)
+            except Exception as e:
+                logger.error("[Stateless] Error: %s", e)
+                sel.unregister(conn)
+                conn.close()
+                return
+            if state.framed:
+                response = FRAME_HEADER.pack(len(response)) + response
+            elif not state.binary:
+                state.inbuf = None       # Unframed: one request only
+            state.outbuf = memoryview(response)
+            if not self._reactor_send(sel, conn, state):
+                return                   # Closed, or waiting to be writable
+    
+    def _parse_buffered(self, state):
+        """Return the request in state.inbuf if it is complete, else None."""
+        buf = state.inbuf
+        if not state.framed:
+            if buf[0] != 0:
+                # Unframed JSON has no length: complete once it parses.
+                # Leading whitespace is fine; anything else that can't
+                # start JSON never will, so the connection is dropped now
+                text = buf.lstrip()
+                if text and text[0] not in JSON_FIRST_BYTES:
+                    raise ValueError('Not a JSON request')
+                try:
+                    return json_loads(buf)
+                except ValueError:
+                    return None
+            state.framed = True
+        
+        if len(buf) < FRAME_HEADER.size:
+            return None
+        (length,) = FRAME_HEADER.unpack_from(buf)
+        end = FRAME_HEADER.size + length
+        if len(buf) < end:
+            return None                  # (inbuf is capped at MAX_REQUEST_SIZE)
+        try:
+            with memoryview(buf) as view:
+                return json_loads(view[FRAME_HEADER.size:end])
+        finally:
+            del buf[:end]                # Keep any pipelined bytes after it
+    
+    def _reactor_send(self, sel, conn, state):
+        """
+        Send as much of outbuf as the socket takes.
+        
+        Returns True once it is all sent and the (framed or binary)
+        connection stays open for another request; False while waiting to
+        be writable or once closed.
+        """
+        try:
+            sent = conn.send(state.outbuf)
+        except BlockingIOError:
+            sent = 0
+        except OSError:                  # Peer is gone: nothing left to do
+            sel.unregister(conn)
+            conn.close()
+            return False
+        state.outbuf = state.outbuf[sent:]
+        
+        if state.outbuf:
+            # Socket buffer full: finish when the kernel says it's writable
+            if not state.writing:
+                sel.modify(conn, selectors.EVENT_WRITE, data=state)
+                state.writing = True
+            return False
+        
+        state.outbuf = None
+        if not (state.framed or state.binary):
+            sel.unregister(conn)
+            conn.close()                 # ...and FORGET, as in handle_client
+            return False
+        if state.writing:
+            sel.modify(conn, selectors.EVENT_READ, data=state)
+            state.writing = False
+        return True
     
     def stop(self):
-        """Stop the server."""
+        """Stop the server (and any forked worker processes)."""
         self.running = False
+        
+        for pid in self._children:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        self._children = []
+        
+        wakeup = self._wakeup_w
+        if wakeup is not None:
+            try:
+                wakeup.send(b'x')        # Wakes the accept loop's select()
+            except OSError:
+                pass                     # Already closed by start()
 
 
 # =============================================================================
@@ -417,31 +1016,40 @@ def demonstrate_stateless():
     └────────────────────────────────────────────────────────────┘
     """)
     
-    def send_request(operation, a, b):
+    recv_buf = bytearray(1024)  # Reused for every response
+    
+    def send_request(sock, operation, a, b):
         """Helper to send request and get result."""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect(('localhost', 8001))
-        request = json.dumps({'operation': operation, 'a': a, 'b': b})
-        sock.send(request.encode())
-        response = json.loads(sock.recv(1024).decode())
-        sock.close()
-        return response['result']
+        request = json_dumps({'operation': operation, 'a': a, 'b': b})
+        send_frame(sock, request)                 # [length][JSON]
+        body = recv_frame(sock, recv_buf)
+        if body is None:
+            raise ConnectionError('Server closed the connection')
+        return json_loads(body)['result']
     
     # Start server in background
     server = StatelessCalculatorServer(port=8001)
     server_thread = threading.Thread(target=server.start)
     server_thread.start()
     
-    import time
-    time.sleep(0.5)  # Let server start
-    
+    sock = None
     try:
+        # Wait until it is listening - no fixed sleep, no race on a slow box
+        if not server.ready.wait(timeout=5):
+            raise RuntimeError('Stateless server did not start')
+        
+        # One connection for all three requests: framing lets the server
+        # tell them apart, so there's no handshake per request. (Still
+        # stateless - the client sends both operands every time.)
+        sock = socket.create_connection(('localhost', 8001))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        
         # ─────────────────────────────────────────────────────────────────
         # Step 1: 10 + 5 = 15
         # ─────────────────────────────────────────────────────────────────
         print("  Step 1:")
         print("    Client: 'Please calculate 10 + 5'")
-        result1 = send_request('add', 10, 5)
+        result1 = send_request(sock, 'add', 10, 5)
         print(f"    Server: 'Result is {result1}'")
         print(f"    Server: *immediately forgets*")
         print(f"    Client: 'I'll store {result1} for later'")
@@ -452,7 +1060,7 @@ def demonstrate_stateless():
         print("\n  Step 2:")
         print(f"    Client: 'Please calculate {result1} × 2'")
         print(f"            (Client must send {result1} - server forgot!)")
-        result2 = send_request('multiply', result1, 2)
+        result2 = send_request(sock, 'multiply', result1, 2)
         print(f"    Server: 'Result is {result2}'")
         print(f"    Server: *immediately forgets*")
         print(f"    Client: 'I'll store {result2} for later'")
@@ -463,7 +1071,7 @@ def demonstrate_stateless():
         print("\n  Step 3:")
         print(f"    Client: 'Please calculate {result2} - 3'")
         print(f"            (Client must send {result2} - server forgot!)")
-        result3 = send_request('subtract', result2, 3)
+        result3 = send_request(sock, 'subtract', result2, 3)
         print(f"    Server: 'Result is {result3}'")
         
         print(f"""
@@ -477,6 +1085,8 @@ def demonstrate_stateless():
         """)
         
     finally:
+        if sock is not None:
+            sock.close()
         server.stop()
         server_thread.join()
 
@@ -486,6 +1096,17 @@ def demonstrate_stateless():
 # =============================================================================
 
 if __name__ == "__main__":
+    logging.basicConfig(format='%(message)s')
+    logger.setLevel(logging.DEBUG)       # Show every request in the demo
+    
+    # Everything per request here is plain Python (parse, dispatch, encode),
+    # which is what PyPy's JIT speeds up most. The code runs on it as is:
+    # without orjson, it uses PyPy's stdlib json, which the JIT also compiles.
+    implementation = platform.python_implementation()
+    print(f"[Stateless Server] Python implementation: {implementation}")
+    if implementation == 'CPython':
+        print("[Stateless Server] Tip: run with pypy3 for a JIT-compiled hot path")
+    
     demonstrate_stateless()
     
     print("""
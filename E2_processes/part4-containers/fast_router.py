@@ -0,0 +1,62 @@
+"""
+================================================================================
+Part 4: Probe Fast Path (compilable with mypyc)
+================================================================================
+
+Orchestrators hit /health and /ready every few seconds on every container,
+so those requests far outnumber real traffic. Answering them is pure byte
+comparison - no parsing, no JSON - which is exactly the kind of code a
+compiler speeds up most. It lives here, fully type-annotated, so it can be
+compiled to a C extension (same approach as part3's calc_ops.py):
+
+    pip install mypy
+    mypyc fast_router.py
+
+mypyc writes fast_router.<platform>.so next to this file. Python prefers
+the extension over fast_router.py on import, so server.py picks up the
+compiled version with no code change. Delete the .so to go back to the
+interpreted one.
+
+    ┌─────────────────────────────┐         ┌─────────────────────────────┐
+    │ fast_router.py (interpreted)│  mypyc  │ fast_router.*.so (native)   │
+    │                             │ ──────► │                             │
+    │  each startswith() is a     │         │  typed bytes compares become│
+    │  trip through the bytecode  │         │  direct C calls             │
+    │  loop                       │         │                             │
+    └─────────────────────────────┘         └─────────────────────────────┘
+
+================================================================================
+"""
+
+from typing import Final, Optional, Tuple
+
+HEALTH_GET: Final = b'GET /health '
+HEALTH_HEAD: Final = b'HEAD /health '
+HEALTH_PATH: Final = b'/health '
+READY_GET: Final[Tuple[bytes, bytes]] = (b'GET /ready ', b'GET /ready?')
+
+
+def probe_response(data: bytes, health: bytes, health_head: bytes,
+                   not_allowed: bytes, ready: bytes) -> Optional[bytes]:
+    """
+    The complete response for a health/readiness probe, or None.
+
+        GET  /health      -> health
+        HEAD /health      -> health_head  (headers only)
+        POST /health ...  -> not_allowed  (405 - probes only GET or HEAD)
+        GET  /ready       -> ready        (current cached readiness)
+        anything else     -> None         (caller routes it normally)
+    """
+    if data.startswith(HEALTH_GET):
+        return health
+    if data.startswith(HEALTH_HEAD):
+        return health_head
+    # Every non-probe request gets here, so look for the method's space in
+    # the first few bytes only and compare in place - no copy of the rest
+    # of the request (a whole POST /calculate) just to test one path
+    sp: int = data.find(b' ', 0, 16)
+    if sp > 0 and data.startswith(HEALTH_PATH, sp + 1):
+        return not_allowed
+    if data.startswith(READY_GET):
+        return ready
+    return None
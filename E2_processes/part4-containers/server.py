@@ -161,15 +161,210 @@ CONTAINER BUILDING BLOCKS
 ================================================================================
 """
 
+import asyncio
+import atexit
+import collections
+import gc
+import math
+import operator
 import socket
 import json
 import threading
 import os
+import re
+import selectors
 import signal
 import sys
 import time
-from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+# Health/readiness probe matching; compile with mypyc for a native build
+from fast_router import probe_response
+
+# orjson, if installed in the image, builds JSON response bodies as bytes
+# ready to go after the HTTP header. It's optional: requirements.txt lists
+# no packages, so a stock build runs the stdlib json fallback below.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    
+    def json_loads(data):
+        # _route_calculate passes the body as a memoryview past the
+        # header; json.loads refuses a view, so only this path copies it
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+    
+    def json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+else:
+    # orjson stops at 64-bit ints; /calculate must not. A body with 19+
+    # digits in a row may hold one orjson would round to a float, and a
+    # 10**10 * 10**10 result makes orjson.dumps raise - stdlib json gets both
+    _LONG_DIGITS = re.compile(rb'[0-9]{19}')
+    
+    def json_loads(data):
+        if _LONG_DIGITS.search(data) is None:
+            return orjson.loads(data)
+        return json.loads(bytes(data))
+    
+    def json_dumps(obj):
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return json.dumps(obj, separators=(',', ':')).encode()
+
+JSONDecodeError = json.JSONDecodeError  # orjson's is a subclass
+
+
+# msgspec decodes a /calculate body straight into a typed struct, validated
+# in C (no dict + .get() chain per request). Optional, like orjson.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+else:
+    class CalcRequest(msgspec.Struct):
+        """A /calculate body; missing fields get the same defaults as before."""
+        operation: str = 'add'
+        a: Union[int, float] = 0  # int stays int: 10 + 5 -> 15, not 15.0
+        b: Union[int, float] = 0
+    
+    _CALC_DECODER = msgspec.json.Decoder(CalcRequest)  # built once
+
+
+# uvloop is a drop-in asyncio event loop built on libuv; SERVER_MODE=asyncio
+# uses the stdlib loop when it isn't installed.
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+# =============================================================================
+# CONFIGURATION (read from the environment ONCE, at import)
+# =============================================================================
+#
+#   A container's environment is fixed when it starts, so there is nothing
+#   to gain by re-reading os.environ per server or per /info request:
+#
+#       docker run -e SERVER_PORT=9000 ...
+#              │
+#              ▼
+#       import server ──► _SERVER_PORT = 9000   (parsed once)
+#                               │
+#                   ┌───────────┴───────────┐
+#                   ▼                       ▼
+#             __init__()              ContainerizedServer
+#                                     (hostname, pid, /info bytes:
+#                                      built once, rebuilt on SIGHUP)
+#
+def _cpu_quota():
+    """
+    CPUs the container may use under its cgroup limit (None if unlimited).
+    
+        docker run --cpus=2 ...
+              │
+              ▼
+        /sys/fs/cgroup/cpu.max:                  "200000 100000"   (v2)
+        /sys/fs/cgroup/cpu/cpu.cfs_quota_us:     "200000"          (v1)
+        /sys/fs/cgroup/cpu/cpu.cfs_period_us:    "100000"
+              │
+              ▼
+        quota / period = 2.0 CPUs
+    
+    os.cpu_count() reports the HOST's cores, so a 2-CPU container on a
+    64-core machine would otherwise size its pool for 64.
+    """
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _default_worker_count():
+    """4 threads per usable CPU: workers mostly wait in recv()/send()."""
+    cpus = _cpu_quota()
+    if cpus is None:
+        if hasattr(os, 'sched_getaffinity'):
+            cpus = len(os.sched_getaffinity(0))  # respects taskset/--cpuset-cpus
+        else:
+            cpus = os.cpu_count() or 1
+    return max(2, math.ceil(cpus) * 4)
+
+
+_SERVER_HOST = os.environ.get('SERVER_HOST', '0.0.0.0')
+_SERVER_PORT = int(os.environ.get('SERVER_PORT', '8000'))
+_WORKER_COUNT = int(os.environ.get('WORKER_COUNT') or _default_worker_count())
+_SERVER_MODE = os.environ.get('SERVER_MODE', 'threads')  # "asyncio", "reuseport"
+_PIN_CPUS = os.environ.get('PIN_CPUS', '0') == '1'  # reuseport: one core per listener
+_SHUTDOWN_GRACE_SEC = int(os.environ.get('SHUTDOWN_GRACE_SEC', '8'))
+_READ_TIMEOUT = float(os.environ.get('READ_TIMEOUT', '2'))  # seconds per request
+# LOG_LEVEL=WARNING (or ERROR) drops the per-request "Request from ..."
+# lines - their f-string is then never even built. Startup, shutdown and
+# errors are always logged.
+_LOG_REQUESTS = os.environ.get('LOG_LEVEL', 'INFO').upper() in ('DEBUG', 'INFO')
+_READINESS_INTERVAL_SEC = float(os.environ.get('READINESS_INTERVAL_SEC', '5'))
+_READINESS_DEPENDENCIES = [  # "host:port,host:port" that /ready TCP-checks
+    d.strip() for d in os.environ.get('READINESS_DEPENDENCIES', '').split(',')
+    if d.strip()
+]
+
+
+# Operation name -> function: one dict lookup to a C built-in instead of an
+# if/elif ladder of string compares (same table as part3's ARITH_OPS)
+ARITH_OPS = {
+    'add': operator.add,
+    'multiply': operator.mul,
+    'subtract': operator.sub,
+}
+
+
+# One compiled, anchored pattern for the whole route table. match() only
+# looks at the start of the request line, so "GET /healthz" or
+# "POST /x?q=GET /health" no longer count as /health; the method is checked
+# together with the path, all inside the C regex engine.
+#
+#       "GET /info HTTP/1.1"  ──► group(lastindex) == b'info'
+#
+_ROUTE_RE = re.compile(rb'(?:GET /(health|info)|POST /(calculate))[ ?]')
+
+
+def _build_http(status, body):
+    """A complete HTTP/1.1 JSON response: status line, headers and body."""
+    return (
+        b"HTTP/1.1 %s\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Content-Length: %d\r\n"
+        b"\r\n" % (status, len(body))
+    ) + body
+
+
+def content_length(headers):
+    """Content-Length from raw request headers (0 if absent or invalid)."""
+    start = headers.lower().find(b'\r\ncontent-length:')
+    if start < 0:
+        return 0
+    start += 18  # len(b'\r\ncontent-length:')
+    end = headers.find(b'\r\n', start)
+    try:
+        return max(0, int(headers[start:end if end >= 0 else None]))
+    except ValueError:
+        return 0
 
 
 class ContainerizedServer:
@@ -184,7 +379,7 @@ class ContainerizedServer:
     │   │                    ENVIRONMENT VARIABLES                        │   │
     │   │   SERVER_HOST ──► "0.0.0.0" (listen on all interfaces)         │   │
     │   │   SERVER_PORT ──► 8000                                          │   │
-    │   │   WORKER_COUNT ──► 4 (thread pool size)                        │   │
+    │   │   WORKER_COUNT ──► 4 x CPUs (thread pool size)                 │   │
     │   └─────────────────────────────────────────────────────────────────┘   │
     │                              │                                          │
     │                              ▼                                          │
@@ -226,6 +421,103 @@ class ContainerizedServer:
     ✓ Process ID and hostname reporting (debugging)
     """
     
+    # ─────────────────────────────────────────────────────────────────────────
+    # Precomputed /health responses (built once, sent as-is)
+    # ─────────────────────────────────────────────────────────────────────────
+    #
+    #   Orchestrators probe /health every few seconds, forever. The probe
+    #   only looks at the status code, so there is nothing to compute:
+    #
+    #       "GET /health HTTP/1.1..."  ──► sendall(HEALTH_RESPONSE)
+    #                                       (no decode, no routing,
+    #                                        no json.dumps, no log line)
+    #
+    #   GET /health?<anything> still takes the full route to health_check()
+    #   for the detailed {status, uptime, requests_handled} view.
+    #
+    HEALTH_BODY = b'{"status":"healthy"}'
+    HEALTH_HEADERS = (
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Content-Length: %d\r\n"
+        b"\r\n" % len(HEALTH_BODY)
+    )
+    HEALTH_RESPONSE = HEALTH_HEADERS + HEALTH_BODY
+    HEALTH_NOT_ALLOWED = (
+        b"HTTP/1.1 405 Method Not Allowed\r\n"
+        b"Allow: GET, HEAD\r\n"
+        b"Content-Length: 0\r\n"
+        b"\r\n"
+    )
+    
+    # Kernel queue of connections not yet accept()ed. With 10, a burst of
+    # connects overflowed it and clients saw resets/SYN retries; 1024 is
+    # the nginx/libuv default (capped at the OS limit)
+    LISTEN_BACKLOG = min(1024, socket.SOMAXCONN)
+    
+    # Requests are read into a per-thread buffer of this size; anything
+    # bigger is refused with 413 instead of being read in pieces
+    MAX_REQUEST_SIZE = 4096
+    # ...and after such an error response, at most this much more input is
+    # read (and dropped) so close() doesn't RST the response away
+    ERROR_DRAIN_TIMEOUT = 0.5
+    ERROR_DRAIN_BYTES = 64 * 1024
+    BAD_REQUEST_RESPONSE = (
+        b"HTTP/1.1 400 Bad Request\r\n"
+        b"Content-Length: 0\r\n"
+        b"\r\n"
+    )
+    REQUEST_TIMEOUT_RESPONSE = (
+        b"HTTP/1.1 408 Request Timeout\r\n"
+        b"Content-Length: 0\r\n"
+        b"\r\n"
+    )
+    TOO_LARGE_RESPONSE = (
+        b"HTTP/1.1 413 Content Too Large\r\n"
+        b"Content-Length: 0\r\n"
+        b"\r\n"
+    )
+    
+    # /ready while draining after SIGTERM, and the per-dependency timeout
+    SHUTTING_DOWN_RESPONSE = _build_http(
+        b'503 Service Unavailable', b'{"status":"shutting_down","checks":{}}')
+    READINESS_CHECK_TIMEOUT = 0.5
+    
+    # Every 200 response: only Content-Length changes, so it's one %-format
+    RESPONSE_HEADER = (
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Content-Length: %d\r\n"
+        b"\r\n"
+    )
+    
+    # ─────────────────────────────────────────────────────────────────────────
+    # Constant responses, fully built once: status line + headers + body
+    # ─────────────────────────────────────────────────────────────────────────
+    #
+    #   GET /, an unknown path or a bad calculate body always produce the
+    #   same bytes, so they cost one sendall() - no dict, no JSON encoding:
+    #
+    ENDPOINTS = [
+        'GET /health - Health check for orchestration',
+        'GET /ready - Readiness (cached dependency checks)',
+        'GET /info - Container environment info',
+        'POST /calculate - Calculator API'
+    ]
+    ENDPOINTS_RESPONSE = _build_http(b'200 OK', json_dumps({'endpoints': ENDPOINTS}))
+    NOT_FOUND_RESPONSE = _build_http(
+        b'404 Not Found', json_dumps({'error': 'Not found', 'endpoints': ENDPOINTS}))
+    BAD_JSON_RESPONSE = _build_http(b'200 OK', b'{"error":"Invalid JSON"}')
+    
+    # Logging: queued lines are written out this often, at most this many
+    # waiting (the oldest are dropped first if stdout falls behind)
+    LOG_FLUSH_INTERVAL = 0.05
+    LOG_QUEUE_SIZE = 4096
+    
+    # Detailed /health?details payload is rebuilt at most once per TTL;
+    # probes landing in the same window share one serialized buffer
+    HEALTH_CACHE_TTL = 1.0
+    
     def __init__(self):
         """
         Initialize server from environment variables.
@@ -240,7 +532,6 @@ class ContainerizedServer:
             │   Dockerfile:                                              │
             │     ENV SERVER_HOST=0.0.0.0                                │
             │     ENV SERVER_PORT=8000      ◄── Defaults                │
-            │     ENV WORKER_COUNT=4                                     │
             │                                                            │
             │   docker run:                                              │
             │     -e SERVER_PORT=9000       ◄── Override at runtime    │
@@ -263,15 +554,39 @@ class ContainerizedServer:
         # ─────────────────────────────────────────────────────────────────────
         # Read configuration from environment (container-friendly!)
         # ─────────────────────────────────────────────────────────────────────
-        self.host = os.environ.get('SERVER_HOST', '0.0.0.0')
-        self.port = int(os.environ.get('SERVER_PORT', '8000'))
-        self.worker_count = int(os.environ.get('WORKER_COUNT', '4'))
+        # (parsed once at import - see CONFIGURATION above)
+        self.host = _SERVER_HOST
+        self.port = _SERVER_PORT
+        self.worker_count = _WORKER_COUNT
+        self.mode = _SERVER_MODE
         
         # Server state
         self.running = False
-        self.request_count = 0
         self.start_time = None
         
+        # Per-thread request counters (see count_request / request_count)
+        self._local = threading.local()
+        self._counters = []  # one [n] cell per worker thread
+        self._counters_lock = threading.Lock()  # only taken by new threads
+        self._health_cache = (float('-inf'), b'')  # (built_at, json bytes)
+        self._log_ts = (0, '')  # (epoch second, formatted prefix)
+        self._loop = None        # asyncio mode: the running event loop
+        
+        # threads mode: what a shutdown drains - accepted connections not
+        # yet finished (queued or running) and their sockets
+        self._inflight = 0
+        self._inflight_cv = threading.Condition()
+        self._client_sockets = set()
+        self._wakeup_r = self._wakeup_w = None  # socketpair: stops accepting
+        self._shutdown_deadline = None
+        
+        # /ready: the response _readiness_loop last built (503 until then)
+        self._ready_state = {'status': 'starting', 'checks': {}}
+        self._ready_response = _build_http(
+            b'503 Service Unavailable', json_dumps(self._ready_state))
+        self._ready_stop = threading.Event()
+        self._async_stop = None  # asyncio mode: set on SIGTERM
+        
         # ─────────────────────────────────────────────────────────────────────
         # Setup signal handlers for graceful shutdown
         # ─────────────────────────────────────────────────────────────────────
@@ -299,6 +614,18 @@ class ContainerizedServer:
         #
         signal.signal(signal.SIGTERM, self.handle_shutdown)
         signal.signal(signal.SIGINT, self.handle_shutdown)  # Also Ctrl+C
+        if hasattr(signal, 'SIGHUP'):  # POSIX only
+            signal.signal(signal.SIGHUP, self.handle_reload)
+        
+        # Hostname, PID and the /info response, cached until SIGHUP
+        self.rebuild_info()
+        
+        # Log lines are queued and written in batches (see log())
+        self._log_q = collections.deque(maxlen=self.LOG_QUEUE_SIZE)
+        self._log_stop = threading.Event()
+        self._log_thread = threading.Thread(target=self._log_writer, daemon=True)
+        self._log_thread.start()
+        atexit.register(self._flush_logs)  # nothing lost on an abrupt exit
     
     def log(self, message):
         """
@@ -321,9 +648,47 @@ class ContainerizedServer:
         
         Container filesystems are EPHEMERAL - files are lost on restart!
         stdout is captured by Docker and can be aggregated.
+        
+        Batched writes:
+        ───────────────
+        
+            worker threads                      log writer thread
+            ──────────────                      ─────────────────
+            log("...") ──► append ──┐
+            log("...") ──► append ──┼──► deque ──► every LOG_FLUSH_INTERVAL:
+            log("...") ──► append ──┘               one write() + flush()
+        
+            A worker never blocks on stdout. The deque holds LOG_QUEUE_SIZE
+            lines; if stdout can't keep up, the OLDEST lines are dropped
+            rather than letting memory (or latency) grow without bound.
         """
-        timestamp = datetime.now().isoformat()
-        print(f"[{timestamp}] {message}", flush=True)  # flush=True for immediate output
+        # The "YYYY-MM-DDTHH:MM:SS" prefix only changes once a second, so it
+        # is formatted once per second and reused; only the millis vary
+        t = time.time()
+        sec = int(t)
+        cached_sec, prefix = self._log_ts
+        if sec != cached_sec:
+            prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(sec))
+            self._log_ts = (sec, prefix)  # one tuple: threads never see half
+        self._log_q.append(f"[{prefix}.{int((t - sec) * 1000):03d}] {message}\n")
+    
+    def _log_writer(self):
+        """Log writer thread: flush the queued lines every interval."""
+        while not self._log_stop.wait(self.LOG_FLUSH_INTERVAL):
+            self._flush_logs()
+        self._flush_logs()  # whatever was logged during shutdown
+    
+    def _flush_logs(self):
+        """Write every queued log line to stdout in one write()."""
+        lines = []
+        try:
+            while True:
+                lines.append(self._log_q.popleft())  # atomic vs. append()
+        except IndexError:
+            pass
+        if lines:
+            sys.stdout.write(''.join(lines))
+            sys.stdout.flush()
     
     def handle_shutdown(self, signum, frame):
         """
@@ -356,6 +721,21 @@ class ContainerizedServer:
                                          │ shutdown    │
                                          └─────────────┘
         
+        Bounded grace period:
+        ─────────────────────
+        
+            SIGTERM ──► stop accepting (wake the accept loop)
+                              │
+                              ▼
+                        wait for in-flight requests, at most
+                        SHUTDOWN_GRACE_SEC (default 8, under Docker's 10)
+                              │
+                              ▼
+                        shutdown() any socket still open ──► exit
+        
+            Finishing before Docker's SIGKILL means no client is ever
+            cut off mid-response by the kill itself.
+        
         Parameters:
         ───────────
         signum : int   - Signal number (15 for SIGTERM, 2 for SIGINT)
@@ -363,8 +743,21 @@ class ContainerizedServer:
         """
         self.log(f"Received signal {signum}, shutting down gracefully...")
         self.running = False  # This will cause main loop to exit
+        self._shutdown_deadline = time.monotonic() + _SHUTDOWN_GRACE_SEC
+        # Not ready any more: load balancers stop sending new traffic
+        self._ready_response = self.SHUTTING_DOWN_RESPONSE
+        self._ready_stop.set()
+        if self._loop is not None:
+            # asyncio mode: wake the event loop (safe from any thread)
+            self._loop.call_soon_threadsafe(self._async_stop.set)
+        elif self._wakeup_w is not None:
+            # threads/reuseport: wake every select() in _accept_loop
+            try:
+                self._wakeup_w.send(b'x')
+            except OSError:
+                pass  # already shut down
     
-    def handle_client(self, client_socket, address):
+    def handle_client(self, client_socket, address, prefix=b''):
         """
         Handle a client request.
         
@@ -387,72 +780,282 @@ class ContainerizedServer:
             │                                   Return: {result}          │
             │                                                             │
             │  GET /           ──────────────►  endpoint_list()          │
-            │  (default)                        Return: {endpoints}       │
+            │                                   Return: {endpoints}       │
+            │                                                             │
+            │  anything else   ──────────────►  404 Not Found            │
+            │                                   Return: {error, endpoints}│
             │                                                             │
             └─────────────────────────────────────────────────────────────┘
         """
         try:
-            data = client_socket.recv(1024).decode()
+            # Responses are one small write: send it now, don't let Nagle
+            # hold it back waiting for the client's (delayed) ACK
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # A client that stalls mid-request must not hold a pool thread
+            client_socket.settimeout(_READ_TIMEOUT)
             
+            data, error = self.recv_request(client_socket, prefix)
+            if error is not None:
+                client_socket.sendall(error)
+                self._discard_unread(client_socket)
+                return
             if not data:
                 return
             
-            # Parse simple HTTP-like request
-            lines = data.split('\n')
-            request_line = lines[0] if lines else ''
-            
-            self.request_count += 1
-            
-            # ─────────────────────────────────────────────────────────────────
-            # Route request to appropriate handler
-            # ─────────────────────────────────────────────────────────────────
-            if 'GET /health' in request_line:
-                # Health endpoint for orchestration (Kubernetes, Docker Swarm)
-                response = self.health_check()
-                
-            elif 'GET /info' in request_line:
-                # Debug endpoint showing container environment
-                response = self.container_info()
-                
-            elif 'POST /calculate' in request_line:
-                # Actual application logic
-                body = lines[-1] if lines else '{}'
-                try:
-                    request = json.loads(body)
-                    response = self.calculate(request)
-                except json.JSONDecodeError:
-                    response = {'error': 'Invalid JSON'}
-                    
-            else:
-                # Default: show available endpoints (API discovery)
-                response = {
-                    'endpoints': [
-                        'GET /health - Health check for orchestration',
-                        'GET /info - Container environment info',
-                        'POST /calculate - Calculator API'
-                    ]
-                }
-            
-            # ─────────────────────────────────────────────────────────────────
-            # Send HTTP response
-            # ─────────────────────────────────────────────────────────────────
-            response_body = json.dumps(response, indent=2)
-            http_response = (
-                "HTTP/1.1 200 OK\r\n"
-                "Content-Type: application/json\r\n"
-                f"Content-Length: {len(response_body)}\r\n"
-                "\r\n"
-                f"{response_body}"
-            )
-            client_socket.send(http_response.encode())
+            response, request_line = self.process_request(data)
+            client_socket.sendall(response)
+            if request_line is None:
+                return  # health probe: no log line
+            if hasattr(socket, 'TCP_QUICKACK'):  # Linux only
+                # ACK the client's FIN right away instead of delaying it
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
             
             # Log to stdout (captured by docker logs)
-            self.log(f"Request from {address[0]}: {request_line.strip()}")
+            if _LOG_REQUESTS:
+                self.log(f"Request from {address[0]}: "
+                         f"{request_line.decode('latin-1').strip()}")
             
         except Exception as e:
             self.log(f"Error handling request: {e}")
         finally:
             client_socket.close()
+            with self._inflight_cv:
+                self._client_sockets.discard(client_socket)
+                self._inflight -= 1
+                if not self._inflight:
+                    self._inflight_cv.notify_all()  # _drain() may be waiting
+    
+    async def handle_client_async(self, reader, writer):
+        """
+        asyncio version of handle_client (SERVER_MODE=asyncio).
+        
+        One event-loop thread multiplexes every connection, so a burst of
+        probes queues as cheap coroutines instead of waiting for one of
+        WORKER_COUNT pool threads:
+        
+            THREADS:  conn ──► pool (4 threads) ──► blocking recv/send
+            ASYNCIO:  conn ──► coroutine on ONE loop (epoll) ──► await
+        
+        process_request() never awaits, so each request runs start to
+        finish without another handler interleaving.
+        """
+        address = writer.get_extra_info('peername') or ('?',)
+        # Same in-flight count the accept loops keep (_readiness_loop reads
+        # it to find idle moments); only the loop thread ever writes it here
+        self._inflight += 1
+        try:
+            try:
+                data, error = await asyncio.wait_for(
+                    self._read_request_async(reader), _READ_TIMEOUT)
+            except asyncio.TimeoutError:
+                data, error = None, self.REQUEST_TIMEOUT_RESPONSE
+            if error is not None:
+                writer.write(error)  # one of the prebuilt 4xx responses
+                return
+            if not data:
+                return
+            
+            response, request_line = self.process_request(data)
+            writer.write(response)
+            await writer.drain()
+            if request_line is not None and _LOG_REQUESTS:
+                self.log(f"Request from {address[0]}: "
+                         f"{request_line.decode('latin-1').strip()}")
+        except Exception as e:
+            self.log(f"Error handling request: {e}")
+        finally:
+            writer.close()
+            self._inflight -= 1
+    
+    async def _read_request_async(self, reader):
+        """recv_request() for a StreamReader: same (data, error) result."""
+        try:
+            data = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            return e.partial, None  # client closed before a blank line
+        except asyncio.LimitOverrunError:
+            return None, self.TOO_LARGE_RESPONSE  # headers too big
+        if data.find(b'\r\n', 0, 256) < 0:
+            return None, self.BAD_REQUEST_RESPONSE  # no request line
+        length = content_length(data)
+        if len(data) + length > self.MAX_REQUEST_SIZE:
+            return None, self.TOO_LARGE_RESPONSE
+        if length:
+            try:
+                data += await reader.readexactly(length)
+            except asyncio.IncompleteReadError as e:
+                data += e.partial  # short body: let the JSON parser reject it
+        return data, None
+    
+    def recv_request(self, client_socket, prefix=b''):
+        """
+        Read one whole request: headers, then exactly Content-Length bytes.
+        
+        Reading strategy:
+        ─────────────────
+        
+            recv_into(buf) ──► "\r\n\r\n" yet? ──NO──► recv_into again
+                                   │                  (until the timeout)
+                                  YES
+                                   ▼
+                         Content-Length: 32 ──► recv_into exactly the
+                                                32 body bytes, no guessing
+        
+        Each worker thread reuses one preallocated MAX_REQUEST_SIZE
+        bytearray, so a GET costs exactly one bytes copy of what arrived -
+        no fresh 4 KB buffer per recv, no header slices. prefix is whatever
+        the accept thread already read (see _dispatch).
+        
+        Returns:
+        ────────
+        (bytes, None)       : the request (b'' if the client sent nothing)
+        (None, bytes)       : a prebuilt 400/408/413 response to send instead
+        """
+        buf = getattr(self._local, 'buf', None)
+        if buf is None:
+            buf = self._local.buf = bytearray(self.MAX_REQUEST_SIZE)
+        n = len(prefix)
+        buf[:n] = prefix
+        view = memoryview(buf)
+        try:
+            header_end = buf.find(b'\r\n\r\n', 0, n)
+            while header_end < 0:
+                # Checked before each recv, so a prefix from _dispatch that
+                # is already junk is refused without waiting for more
+                if n >= 256 and buf.find(b'\r\n', 0, 256) < 0:
+                    return None, self.BAD_REQUEST_RESPONSE  # no request line
+                if n == len(buf):
+                    return None, self.TOO_LARGE_RESPONSE
+                got = client_socket.recv_into(view[n:])
+                if not got:
+                    return bytes(view[:n]), None  # EOF: take what arrived
+                header_end = buf.find(b'\r\n\r\n', max(0, n - 3), n + got)
+                n += got
+            
+            total = header_end + 4
+            if not buf.startswith((b'GET ', b'HEAD ')):
+                # Body-less probes skip this: slicing and lower()ing the
+                # headers would be two more copies on every GET
+                total += content_length(buf[:header_end + 2])
+            if total > len(buf):
+                return None, self.TOO_LARGE_RESPONSE
+            while n < total:
+                got = client_socket.recv_into(view[n:total])
+                if not got:
+                    break  # short body: let the JSON parser reject it
+                n += got
+            return bytes(view[:min(n, total)]), None
+        except socket.timeout:
+            return (None, self.REQUEST_TIMEOUT_RESPONSE) if n else (b'', None)
+        finally:
+            view.release()
+    
+    def _discard_unread(self, client_socket):
+        """
+        After a 400/408/413: let the client actually read the response.
+        
+            close() with unread request bytes queued ──► kernel sends RST,
+            which can destroy the response before the client reads it
+        
+            shutdown(SHUT_WR) ──► FIN after the response
+            recv until EOF     ──► queue empty, so close() is a clean FIN
+        
+        Bounded by ERROR_DRAIN_TIMEOUT and ERROR_DRAIN_BYTES, so a client
+        that keeps sending can't hold the thread.
+        """
+        try:
+            client_socket.shutdown(socket.SHUT_WR)
+            deadline = time.monotonic() + self.ERROR_DRAIN_TIMEOUT
+            buf = self._local.buf  # recv_request() created it
+            drained = 0
+            while drained < self.ERROR_DRAIN_BYTES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                client_socket.settimeout(remaining)
+                got = client_socket.recv_into(buf)
+                if not got:
+                    break  # client closed its side: nothing left unread
+                drained += got
+        except OSError:
+            pass  # reset/timeout: we tried; close() follows either way
+    
+    def process_request(self, data):
+        """
+        Turn one raw request into a full HTTP response.
+        
+        Shared by handle_client (threads) and handle_client_async.
+        
+        Returns:
+        ────────
+        (bytes, bytes | None) : (HTTP response, request line to log -
+                                 None for health probes, which aren't logged)
+        """
+        # ─────────────────────────────────────────────────────────────────────
+        # Fast path: health/readiness probes, matched on the raw bytes
+        # (fast_router.py - native code when compiled with mypyc)
+        # ─────────────────────────────────────────────────────────────────────
+        response = probe_response(data, self.HEALTH_RESPONSE, self.HEALTH_HEADERS,
+                                  self.HEALTH_NOT_ALLOWED,
+                                  self._ready_response)  # rebuilt by _readiness_loop
+        if response is not None:
+            return response, None
+        
+        # Request line = bytes up to the first CRLF (no decode, no split)
+        end = data.find(b'\r\n')
+        request_line = data if end < 0 else data[:end]
+        
+        self.count_request()
+        
+        # ─────────────────────────────────────────────────────────────────────
+        # Route request to appropriate handler (one anchored regex match)
+        # ─────────────────────────────────────────────────────────────────────
+        m = _ROUTE_RE.match(request_line)
+        if m is not None:
+            response = self.ROUTES[m.group(m.lastindex)](self, data)
+        elif request_line.startswith((b'GET / ', b'GET /?')):
+            # Show available endpoints (API discovery)
+            return self.ENDPOINTS_RESPONSE, request_line
+        else:
+            # Unknown path: 404, with the endpoint list to point the way
+            return self.NOT_FOUND_RESPONSE, request_line
+        
+        if type(response) is bytes:
+            return response, request_line  # complete prebuilt response
+        response_body = json_dumps(response)
+        return self.RESPONSE_HEADER % len(response_body) + response_body, request_line
+    
+    def count_request(self):
+        """
+        Count one request without touching any shared variable.
+        
+        Per-thread counters:
+        ────────────────────
+        
+            self.request_count += 1            c[0] += 1
+            ───────────────────────            ─────────
+            
+            Worker 0 ─┐                        Worker 0 ──► [12]
+            Worker 1 ─┼──► request_count       Worker 1 ──► [ 9]  ──► sum()
+            Worker 2 ─┤    (one shared int,    Worker 2 ──► [15]     only on
+            Worker 3 ─┘     racy read-add-     Worker 3 ──► [11]     /health
+                            write)
+        
+        Each thread registers its cell once (under the lock) and then
+        increments only its own cell, so no update can be lost.
+        """
+        c = getattr(self._local, 'c', None)
+        if c is None:
+            c = [0]
+            with self._counters_lock:
+                self._counters.append(c)
+            self._local.c = c
+        c[0] += 1
+    
+    @property
+    def request_count(self):
+        """Total requests handled, summed over all worker threads."""
+        return sum(c[0] for c in self._counters)
     
     def health_check(self):
         """
@@ -492,15 +1095,97 @@ class ContainerizedServer:
             HEALTHCHECK --interval=30s --timeout=3s --retries=3 \
                 CMD curl -f http://localhost:8000/health || exit 1
         
+        Cached for HEALTH_CACHE_TTL seconds:
+        ────────────────────────────────────
+        
+            probe ──► now - built_at < TTL ? ──YES──► cached bytes
+                                │
+                                NO
+                                ▼
+                      build dict, json_dumps (compact), store (now, bytes)
+        
         Returns:
         ────────
-        dict : {status, uptime_seconds, requests_handled}
+        bytes : JSON {status, uptime_seconds, requests_handled}
         """
-        return {
+        now = time.monotonic()
+        built_at, payload = self._health_cache
+        if now - built_at < self.HEALTH_CACHE_TTL:
+            return payload
+        
+        payload = json_dumps({
             'status': 'healthy',
             'uptime_seconds': time.time() - self.start_time if self.start_time else 0,
             'requests_handled': self.request_count
-        }
+        })
+        self._health_cache = (now, payload)
+        return payload
+    
+    def _readiness_loop(self):
+        """
+        Readiness thread: re-run check_readiness() every interval.
+        
+        It also runs the young-generation GC pass while no request is in
+        flight, which resets the allocation counter: the automatic pass
+        (every 100,000 allocations, see start()) then rarely lands in the
+        middle of a request.
+        """
+        while True:
+            self.check_readiness()
+            if not self._inflight:
+                gc.collect(0)  # idle: a pause here delays nobody
+            if self._ready_stop.wait(_READINESS_INTERVAL_SEC):
+                return  # shutdown: stop promptly, not at the next tick
+    
+    def check_readiness(self):
+        """
+        Run the readiness checks and cache the /ready response.
+        
+        Liveness vs readiness:
+        ──────────────────────
+        
+            /health (liveness)              /ready (readiness)
+            ──────────────────              ──────────────────
+            "Is the process alive?"         "Should I get traffic?"
+            no I/O, static bytes            dependency checks, cached
+            failing ──► RESTART             failing ──► no traffic (503),
+                                                        but NOT restarted
+        
+            Probes never wait on a dependency: they get whatever this
+            method built last, at most READINESS_INTERVAL_SEC old. A slow
+            or dead dependency therefore can't make the probe itself time
+            out and get every replica restarted at once.
+        
+        Each READINESS_DEPENDENCIES entry ("host:port") is checked with a
+        TCP connect bounded by READINESS_CHECK_TIMEOUT:
+        
+            {"status": "ready",
+             "checks": {"db:5432": {"status": "up", "latency_ms": 0.4}}}
+        """
+        checks = {}
+        for dependency in _READINESS_DEPENDENCIES:
+            host, _, port = dependency.rpartition(':')
+            t0 = time.perf_counter()
+            try:
+                socket.create_connection(
+                    (host, int(port)), timeout=self.READINESS_CHECK_TIMEOUT
+                ).close()
+                status = 'up'
+            except (OSError, ValueError):
+                status = 'down'
+            checks[dependency] = {
+                'status': status,
+                'latency_ms': round((time.perf_counter() - t0) * 1000, 1)
+            }
+        
+        ready = self.running and all(c['status'] == 'up' for c in checks.values())
+        self._ready_state = {'status': 'ready' if ready else 'not_ready',
+                             'checks': checks}
+        self._ready_response = _build_http(
+            b'200 OK' if ready else b'503 Service Unavailable',
+            json_dumps(self._ready_state))
+        if not self.running:
+            self._ready_response = self.SHUTTING_DOWN_RESPONSE
     
     def container_info(self):
         """
@@ -532,23 +1217,52 @@ class ContainerizedServer:
         
         Returns:
         ────────
-        dict : Container environment details
+        bytes : Container environment details as JSON (see rebuild_info)
         """
-        return {
-            'hostname': os.environ.get('HOSTNAME', socket.gethostname()),
+        return self._info_bytes
+    
+    def rebuild_info(self):
+        """
+        (Re)build the cached /info payload and identity fields.
+        
+        Hostname and PID never change while a container runs, so the
+        gethostname()/getpid() syscalls and the JSON encoding happen here -
+        at startup and on SIGHUP - instead of on every /info request:
+        
+            __init__ ──┐
+                       ├──► rebuild_info() ──► _info_bytes, _info_response
+            SIGHUP ────┘                            │
+                                                    ▼
+                                     GET /info: one sendall(), no work
+        
+        The same goes for the tail every /calculate response ends with:
+        
+            _processed_by = b',"processed_by":"abc123"}'
+        """
+        self._hostname = os.environ.get('HOSTNAME') or socket.gethostname()
+        self._processed_by = b',"processed_by":' + json_dumps(self._hostname) + b'}'
+        self._pid = os.getpid()
+        self._py_version = sys.version
+        self._info_bytes = json_dumps({
+            'hostname': self._hostname,
             'server_host': self.host,
             'server_port': self.port,
             'worker_count': self.worker_count,
-            'process_id': os.getpid(),
-            'python_version': sys.version,
+            'process_id': self._pid,
+            'python_version': self._py_version,
             'environment': {
-                'SERVER_HOST': os.environ.get('SERVER_HOST', 'not set'),
-                'SERVER_PORT': os.environ.get('SERVER_PORT', 'not set'),
-                'WORKER_COUNT': os.environ.get('WORKER_COUNT', 'not set')
+                k: os.environ.get(k, 'not set')
+                for k in ('SERVER_HOST', 'SERVER_PORT', 'WORKER_COUNT')
             }
-        }
+        })
+        self._info_response = _build_http(b'200 OK', self._info_bytes)
     
-    def calculate(self, request):
+    def handle_reload(self, signum, frame):
+        """SIGHUP: rebuild the cached /info response (see rebuild_info)."""
+        self.rebuild_info()
+        self.log(f"Received signal {signum}, rebuilt /info")
+    
+    def calculate(self, operation, a, b):
         """
         Simple calculator - the actual application logic.
         
@@ -571,29 +1285,88 @@ class ContainerizedServer:
             }
         
         The processed_by field shows which container handled the request.
-        Useful for debugging load balancing!
-        """
-        operation = request.get('operation', 'add')
-        a = request.get('a', 0)
-        b = request.get('b', 0)
-        
-        if operation == 'add':
-            result = a + b
-        elif operation == 'multiply':
-            result = a * b
-        elif operation == 'subtract':
-            result = a - b
-        else:
+        Useful for debugging load balancing! It is constant, so it is not
+        in the returned dict: _route_calculate appends it as prebuilt bytes.
+        
+            json_dumps(dict)  ──►  b'{..."result":15}'
+                                                 │ drop the "}"
+                                                 ▼
+                                   b'{..."result":15' + _processed_by
+        """
+        # (a JSON list/object as "operation" is unhashable - not a dict key)
+        op = ARITH_OPS.get(operation) if type(operation) is str else None
+        if op is None:
             return {'error': f'Unknown operation: {operation}'}
+        result = op(a, b)
         
         return {
             'operation': operation,
             'a': a,
             'b': b,
             'result': result,
-            'processed_by': os.environ.get('HOSTNAME', 'unknown')
         }
     
+    # ─────────────────────────────────────────────────────────────────────────
+    # Route handlers: (self, raw request bytes) -> a dict to send as JSON, or
+    # bytes that are already a complete HTTP response
+    # ─────────────────────────────────────────────────────────────────────────
+    
+    def _route_health(self, data):
+        # Health endpoint for orchestration (Kubernetes, Docker Swarm)
+        body = self.health_check()
+        return self.RESPONSE_HEADER % len(body) + body
+    
+    def _route_info(self, data):
+        # Debug endpoint showing container environment (never changes)
+        return self._info_response
+    
+    def _route_calculate(self, data):
+        # Actual application logic - the only route that reads a body
+        body_start = data.find(b'\r\n\r\n')
+        if body_start < 0:
+            body = data.rpartition(b'\n')[2]  # bare-LF client: last line
+        else:
+            body = memoryview(data)[body_start + 4:]  # no copy
+        if msgspec is not None:
+            try:
+                request = _CALC_DECODER.decode(body)
+            except msgspec.ValidationError as e:
+                return {'error': f'Invalid request: {e}'}  # e.g. "a": "ten"
+            except msgspec.DecodeError:
+                return self.BAD_JSON_RESPONSE
+            response = self.calculate(request.operation, request.a, request.b)
+        else:
+            try:
+                request = json_loads(body)
+            except JSONDecodeError:
+                return self.BAD_JSON_RESPONSE
+            response = self.calculate(request.get('operation', 'add'),
+                                      request.get('a', 0), request.get('b', 0))
+        if 'error' in response:
+            return response
+        result = response['result']
+        if type(result) is float and not math.isfinite(result):
+            # orjson writes inf/nan as null; keep json's Infinity/NaN
+            body = json.dumps(response, separators=(',', ':')).encode()
+        else:
+            body = json_dumps(response)
+        body = body[:-1] + self._processed_by
+        return self.RESPONSE_HEADER % len(body) + body
+    
+    #   Path matched by _ROUTE_RE ──► handler:
+    #
+    #       GET  /health[?...]     ──► _route_health
+    #       GET  /info[?...]       ──► _route_info
+    #       POST /calculate[?...]  ──► _route_calculate
+    #       GET  /                 ──► ENDPOINTS_RESPONSE
+    #       (no match)             ──► NOT_FOUND_RESPONSE
+    #
+    ROUTES = {
+        b'health': _route_health,
+        b'info': _route_info,
+        b'calculate': _route_calculate,
+    }
+    
     def start(self):
         """
         Start the server.
@@ -612,13 +1385,13 @@ class ContainerizedServer:
             │     └── bind((0.0.0.0, 8000))                              │
             │                                                             │
             │  3. Start listening                                         │
-            │     └── listen(backlog=10)                                 │
+            │     └── listen(backlog=1024)                               │
             │                                                             │
             │  4. Log startup info                                        │
             │     └── (captured by docker logs)                          │
             │                                                             │
             │  5. Create thread pool                                      │
-            │     └── ThreadPoolExecutor(max_workers=4)                  │
+            │     └── ThreadPoolExecutor(max_workers=WORKER_COUNT)       │
             │                                                             │
             │  6. Accept loop                                             │
             │     └── while self.running:                                │
@@ -633,29 +1406,310 @@ class ContainerizedServer:
         self.start_time = time.time()
         
         # Create and configure socket
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server_socket.bind((self.host, self.port))
-        server_socket.listen(10)
-        server_socket.settimeout(1)  # Allow checking self.running
+        server_socket = self._listen()
         
         # Log startup info (captured by docker logs)
         self.log(f"Server starting on {self.host}:{self.port}")
         self.log(f"Worker threads: {self.worker_count}")
-        self.log(f"Process ID: {os.getpid()}")
-        self.log(f"Hostname: {os.environ.get('HOSTNAME', socket.gethostname())}")
+        self.log(f"Process ID: {self._pid}")
+        self.log(f"Hostname: {self._hostname}")
         
-        # Use thread pool for bounded concurrency
-        with ThreadPoolExecutor(max_workers=self.worker_count) as executor:
-            while self.running:
-                try:
-                    client_socket, address = server_socket.accept()
-                    executor.submit(self.handle_client, client_socket, address)
-                except socket.timeout:
-                    continue  # Check if still running
+        # Readiness checks run in the background, never in a probe's request
+        readiness = threading.Thread(target=self._readiness_loop, daemon=True)
+        readiness.start()
+        
+        # ─────────────────────────────────────────────────────────────────
+        # Keep the garbage collector off the request path
+        # ─────────────────────────────────────────────────────────────────
+        #
+        #   Per-request garbage (dicts, bytes, JSON objects) is freed by
+        #   reference counting the moment a request is done; the cyclic GC
+        #   only adds pauses. So, once everything long-lived exists:
+        #
+        #       gc.freeze()          all objects alive now ──► permanent
+        #                            generation, never scanned again
+        #       set_threshold(100k)  a gen-0 pass every 100,000 net
+        #                            allocations instead of every 700
+        #       _readiness_loop      runs that pass itself whenever idle
+        #
+        #   Not gc.disable(): the threshold stays as a safety net, so a
+        #   reference cycle created per request can't grow without bound.
+        #
+        gc.collect()
+        gc.freeze()
+        gc.set_threshold(100_000, 50, 10)
+        
+        if self.mode != 'asyncio':
+            # handle_shutdown() wakes the accept loops through this pair
+            self._wakeup_r, self._wakeup_w = socket.socketpair()
+        
+        if self.mode == 'asyncio':
+            self.log(f"Mode: asyncio{' (uvloop)' if uvloop else ''}")
+            # The event exists before _loop does: handle_shutdown() only looks
+            # at _loop, so a SIGTERM at any point finds something to set
+            self._async_stop = asyncio.Event()
+            self._loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.serve(server_socket))
+            finally:
+                self._loop.close()
+                self._loop = None
+        elif self.mode == 'reuseport':
+            self._serve_reuseport(server_socket)
+        else:
+            # Use thread pool for bounded concurrency
+            executor = ThreadPoolExecutor(max_workers=self.worker_count)
+            try:
+                self._accept_loop(server_socket, lambda client_socket, address:
+                                  self._dispatch(executor, client_socket, address))
+            finally:
+                self._drain(executor)
         
         server_socket.close()
+        if self._wakeup_r is not None:
+            self._wakeup_r.close()
+            self._wakeup_w.close()
+        self._ready_stop.set()
+        readiness.join()
         self.log("Server stopped")
+        self._log_stop.set()
+        self._log_thread.join()
+    
+    def _listen(self):
+        """Create, bind and listen on one server socket."""
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            # Several sockets (or server processes) may bind the same port;
+            # the kernel load-balances incoming connections between them
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if hasattr(socket, 'TCP_DEFER_ACCEPT'):
+            # Linux: accept() returns once the request's first bytes are
+            # in, not at the bare handshake (what _dispatch relies on)
+            server_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_DEFER_ACCEPT, 1)
+        server_socket.bind((self.host, self.port))
+        server_socket.listen(self.LISTEN_BACKLOG)
+        server_socket.setblocking(False)  # accept() only when select() says so
+        return server_socket
+    
+    def _accept_loop(self, server_socket, dispatch):
+        """
+        Accept until shutdown; dispatch(client_socket, address) each one.
+        
+        Selector instead of a polling timeout:
+        ──────────────────────────────────────
+        
+            BEFORE: accept() with settimeout(1)
+                    idle server wakes every second just to check
+                    self.running; SIGTERM waits up to 1s to be noticed
+        
+            NOW:    select() on { listening socket, wakeup socket }
+                    (epoll on Linux) - sleeps until there is a connection,
+                    and handle_shutdown() writes one byte to the wakeup
+                    socket to end the wait immediately
+        
+        One wakeup drains the whole accept queue: a burst of N connections
+        costs one select() and N accept() calls, not N of each.
+        """
+        selector = selectors.DefaultSelector()
+        selector.register(server_socket, selectors.EVENT_READ)
+        selector.register(self._wakeup_r, selectors.EVENT_READ)
+        try:
+            while self.running:
+                for key, _ in selector.select():
+                    if key.fileobj is self._wakeup_r:
+                        return  # handle_shutdown() - stop accepting
+                    while True:
+                        try:
+                            client_socket, address = server_socket.accept()
+                        except BlockingIOError:
+                            break  # queue empty (or another acceptor got it)
+                        with self._inflight_cv:
+                            self._inflight += 1
+                            self._client_sockets.add(client_socket)
+                        dispatch(client_socket, address)
+        finally:
+            selector.close()
+    
+    def _dispatch(self, executor, client_socket, address):
+        """
+        Threads mode: hand a new connection to the pool - or, when the
+        pool is idle anyway, answer a simple GET right here.
+        
+            executor.submit():  lock + queue append + wake a worker
+                                (futex) + context switch ... to run a
+                                request that takes microseconds
+        
+            idle pool, GET already in the socket buffer:
+                accept thread ──► recv (non-blocking) ──► handle inline
+            anything else (busy pool, POST, not arrived yet):
+                pool worker, given whatever was already read
+        
+        Only body-less requests that are already complete run inline, so
+        a slow client can never stall the accept loop. On Linux the
+        listener has TCP_DEFER_ACCEPT, so by the time accept() returns the
+        request has usually arrived and the recv finds it.
+        """
+        prefix = b''
+        if self._inflight == 1:  # only this connection: nobody is waiting
+            client_socket.setblocking(False)
+            try:
+                prefix = client_socket.recv(self.MAX_REQUEST_SIZE)
+            except OSError:
+                pass  # nothing yet (or reset): the worker finds out
+            else:
+                if prefix.startswith((b'GET ', b'HEAD ')) and b'\r\n\r\n' in prefix:
+                    self.handle_client(client_socket, address, prefix)
+                    return
+        executor.submit(self.handle_client, client_socket, address, prefix)
+    
+    def _serve_reuseport(self, server_socket):
+        """
+        SERVER_MODE=reuseport: one listening socket per worker thread.
+        
+            THREADS (default):                 REUSEPORT:
+            ──────────────────                 ──────────
+            
+                  :8000 queue                  :8000  :8000  :8000  :8000
+                       │                         │      │      │      │
+                   accept()                    accept accept accept accept
+                       │                         │      │      │      │
+                 executor queue               handle handle handle handle
+                 ┌──┬──┴──┬──┐               (same thread - no queue hop,
+                 W0 W1   W2 W3                 no Future per request)
+        
+            Every socket binds the same port with SO_REUSEPORT, and the
+            kernel hashes each new connection to one of them, spreading
+            short requests evenly across the threads. Without SO_REUSEPORT
+            (e.g. Windows) the threads all accept() on the one socket.
+        
+        PIN_CPUS=1 (Linux): listener thread i stays on allowed core i % N,
+        so a connection's accept, request and response all run on one
+        core's warm caches instead of migrating between cores. Each
+        listener also gets SO_INCOMING_CPU, so the kernel prefers handing
+        it connections whose packets arrived on that same core.
+        """
+        if hasattr(socket, 'SO_REUSEPORT'):
+            listeners = [server_socket] + [
+                self._listen() for _ in range(self.worker_count - 1)]
+        else:
+            listeners = [server_socket] * self.worker_count
+        cpus = [None] * len(listeners)
+        if _PIN_CPUS and hasattr(os, 'sched_setaffinity'):
+            allowed = sorted(os.sched_getaffinity(0))
+            cpus = [allowed[i % len(allowed)] for i in range(len(listeners))]
+        self.log(f"Mode: reuseport ({len(set(listeners))} listening socket(s)"
+                 f"{', pinned to CPUs' if cpus[0] is not None else ''})")
+        
+        acceptors = [
+            threading.Thread(target=self._listener_thread,
+                             args=(s, cpu), daemon=True)
+            for s, cpu in zip(listeners[1:], cpus[1:])
+        ]
+        for acceptor in acceptors:
+            acceptor.start()
+        try:
+            self._listener_thread(listeners[0], cpus[0])
+        finally:
+            self._drain(None)
+            for acceptor in acceptors:
+                acceptor.join(timeout=1)
+            for listener in listeners:
+                listener.close()
+    
+    def _listener_thread(self, listener, cpu):
+        """Reuseport mode: serve one listener, on one CPU if cpu is set."""
+        if cpu is not None:
+            os.sched_setaffinity(0, {cpu})  # 0 = the calling thread on Linux
+            if hasattr(socket, 'SO_INCOMING_CPU'):
+                listener.setsockopt(socket.SOL_SOCKET, socket.SO_INCOMING_CPU, cpu)
+        self._accept_loop(listener, self.handle_client)
+    
+    def _drain(self, executor):
+        """
+        Threads mode: wait out the grace period, then drop what's left.
+        
+        Waits until every accepted connection has been handled or the
+        shutdown deadline passes, then shutdown()s the sockets still open -
+        a worker blocked in recv() wakes up with EOF - and cancels the
+        handlers that never started (executor is None in reuseport mode,
+        where handlers run on the accepting threads themselves).
+        
+        It then joins the workers: with their sockets shut down they finish
+        at once, so "Server stopped" really is the last line logged.
+        """
+        if self._shutdown_deadline is None:
+            timeout = _SHUTDOWN_GRACE_SEC
+        else:
+            timeout = max(0.0, self._shutdown_deadline - time.monotonic())
+        with self._inflight_cv:
+            if not self._inflight_cv.wait_for(lambda: not self._inflight, timeout):
+                stragglers = list(self._client_sockets)
+            else:
+                stragglers = []
+        if stragglers:
+            self.log(f"Dropping {len(stragglers)} connection(s) after "
+                     f"{_SHUTDOWN_GRACE_SEC}s grace period")
+        for client_socket in stragglers:
+            try:
+                client_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # already closed by its handler
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        for client_socket in stragglers:
+            client_socket.close()  # handlers that were cancelled never did
+    
+    async def serve(self, server_socket):
+        """
+        asyncio accept loop: serve until SIGTERM, then drain for a bit.
+        
+            SIGTERM ──► loop ──► handle_shutdown() ──► _async_stop.set()
+                                                             │
+                                                             ▼
+                        stop accepting ──► wait up to SHUTDOWN_GRACE_SEC
+                                           for in-flight handlers
+                                                             │
+                                                             ▼
+                                           cancel the stragglers
+        """
+        if not self.running:  # signal arrived before the loop was up
+            return
+        handlers = set()
+        
+        def track(reader, writer):
+            task = asyncio.ensure_future(self.handle_client_async(reader, writer))
+            handlers.add(task)
+            task.add_done_callback(handlers.discard)
+        
+        server = await asyncio.start_server(track, sock=server_socket,
+                                            limit=self.MAX_REQUEST_SIZE)
+        
+        # Deliver SIGTERM/SIGINT through the loop: handle_shutdown() then
+        # runs as an ordinary callback between tasks, never in the middle
+        # of one the way a signal.signal() handler can
+        loop = asyncio.get_running_loop()
+        loop_signals = []
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.handle_shutdown, sig, None)
+            except (NotImplementedError, RuntimeError, ValueError):
+                break  # Windows, or not the main thread: keep signal.signal()
+            loop_signals.append(sig)
+        try:
+            await self._async_stop.wait()
+        finally:
+            for sig in loop_signals:
+                loop.remove_signal_handler(sig)
+                signal.signal(sig, self.handle_shutdown)  # for the drain below
+            server.close()
+            if handlers:
+                _, pending = await asyncio.wait(handlers, timeout=_SHUTDOWN_GRACE_SEC)
+                for task in pending:
+                    task.cancel()  # grace period over: drop the connection
+                if pending:
+                    self.log(f"Dropped {len(pending)} connection(s) after "
+                             f"{_SHUTDOWN_GRACE_SEC}s grace period")
 
 
 # =============================================================================